@@ -1,17 +1,28 @@
 from flask import Flask
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
+from config import Config
 from routes.recipes import recipes_bp
 from routes.chat import chat_bp
 from routes.search import search_bp
 from routes.instacart import instacart_bp
 from routes.otp_routes import otp
+from routes.admin import admin_bp
+from routes.plan import plan_bp
+from routes.shopping_list import shopping_list_bp
+from routes.metrics import metrics_bp
+from services import metrics
 import logging
 
 # Configure logging to only show warnings and errors
 logging.getLogger('werkzeug').setLevel(logging.WARNING)
 
 app = Flask(__name__)
-CORS(app, resources={r"/*": {"origins": "*"}})  # Allow all origins for development
+if Config.TRUSTED_PROXIES:
+    # Use the client address the proxy saw, e.g. for per-IP rate limits
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=Config.TRUSTED_PROXIES)
+metrics.init_app(app)
+CORS(app, resources={r"/*": {"origins": "*"}}, expose_headers=["X-Next-Cursor", "ETag"])  # Allow all origins for development
 
 # Register blueprints
 app.register_blueprint(recipes_bp)
@@ -19,6 +30,10 @@ app.register_blueprint(chat_bp)
 app.register_blueprint(search_bp)
 app.register_blueprint(instacart_bp, url_prefix="/api")  # Ensure '/api' prefix is correct
 app.register_blueprint(otp)
+app.register_blueprint(admin_bp)
+app.register_blueprint(plan_bp)
+app.register_blueprint(shopping_list_bp)
+app.register_blueprint(metrics_bp)
 
 if __name__ == "__main__":
     # Run with minimal output
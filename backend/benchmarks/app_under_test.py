@@ -0,0 +1,22 @@
+"""The real Flask app with upstream calls pointed at local stubs.
+
+Used by ``benchmarks.loadtest`` as the server process. The catalog comes
+from ``CATALOG_SNAPSHOT_PATH`` and OpenAI/Instacart from their ``*_BASE_URL``
+settings; Twilio is swapped here because its SDK has no base-URL setting.
+Serve it with gunicorn (``gunicorn benchmarks.app_under_test:app``) or run
+the module for Werkzeug's threaded server.
+"""
+import os
+
+from twilio.rest import Client
+
+from app import app
+from benchmarks.stub_twilio import StubTwilioHttpClient
+import routes.otp_routes as otp_routes
+
+if os.getenv("TWILIO_STUB_URL"):
+    otp_routes.client = Client("AC0", "token", http_client=StubTwilioHttpClient(os.environ["TWILIO_STUB_URL"]))
+
+
+if __name__ == "__main__":
+    app.run(host="127.0.0.1", port=int(os.getenv("PORT", "5055")), threaded=True)
@@ -0,0 +1,56 @@
+"""Measure the per-request cost of bearer-token auth.
+
+Times a bare ``jwt.decode`` against ``TokenVerifier.verify`` on a cached
+token, then a plain route against the same route behind ``require_auth``
+through the Flask test client. Run from the backend directory::
+
+    python -m benchmarks.bench_auth
+"""
+import statistics
+import time
+
+from flask import Flask, jsonify
+import jwt
+
+from services.auth import TokenVerifier, require_auth, verifier
+
+CALLS = 20_000
+REQUESTS = 5_000
+
+
+def _time(fn, count):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def run(calls=CALLS, requests=REQUESTS):
+    token = verifier.issue("+15550000000", "bench")
+    uncached = TokenVerifier(verifier.secret, 1)
+
+    results = {
+        "jwt.decode": _time(lambda: jwt.decode(token, verifier.secret, algorithms=["HS256"]), calls),
+        "verify (cached)": _time(lambda: verifier.verify(token), calls),
+        "verify (cache miss)": _time(lambda: (uncached.cache.clear(), uncached.verify(token)), calls),
+    }
+
+    app = Flask(__name__)
+    app.add_url_rule("/open", "open", lambda: jsonify({}))
+    app.add_url_rule("/private", "private", require_auth(lambda: jsonify({})))
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {token}"}
+    results["GET /open"] = _time(lambda: client.get("/open"), requests)
+    results["GET /private"] = _time(lambda: client.get("/private", headers=headers), requests)
+
+    for name, (p50, p99) in results.items():
+        print(f"{name:>36}: p50={p50:7.1f}us p99={p99:7.1f}us")
+    overhead = results["GET /private"][0] - results["GET /open"][0]
+    print(f"{'auth overhead per request':>36}: {overhead:7.1f}us")
+
+
+if __name__ == "__main__":
+    run()
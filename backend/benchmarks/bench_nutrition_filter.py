@@ -0,0 +1,43 @@
+"""Measure vectorized nutrition filtering over a large synthetic catalog.
+
+Run from the backend directory::
+
+    python -m benchmarks.bench_nutrition_filter
+"""
+import statistics
+import time
+
+from benchmarks.synthetic import build_catalog
+from services.data_loader import DataLoader
+
+SIZE = 100_000
+RUNS = 200
+
+
+def _time(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e3)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def run(size=SIZE, runs=RUNS):
+    nutrition = DataLoader(tables=build_catalog(size)).nutrition
+    bounds = {"protein": (30, None), "carbs": (None, 40), "fat": (5, 25)}
+
+    cases = {
+        "mask only": lambda: nutrition.mask(bounds),
+        "all matches by cal_per_protein": lambda: nutrition.query(bounds, "cal_per_protein"),
+        "first page of 20 by cal_per_protein": lambda: nutrition.query(bounds, "cal_per_protein", limit=20),
+        "first page of 20, protein range only": lambda: nutrition.query({"protein": (30, 40)}, "protein", limit=20),
+    }
+    for label, fn in cases.items():
+        p50, p99 = _time(fn, runs)
+        print(f"{size} recipes, {label}: p50={p50:.3f}ms p99={p99:.3f}ms")
+
+
+if __name__ == "__main__":
+    run()
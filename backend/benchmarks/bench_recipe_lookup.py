@@ -0,0 +1,39 @@
+"""Measure DataLoader.get_recipe_by_id latency as the catalog grows.
+
+Run from the backend directory::
+
+    python -m benchmarks.bench_recipe_lookup
+"""
+import random
+import statistics
+import time
+
+from benchmarks.synthetic import build_catalog
+from services.data_loader import DataLoader
+
+SIZES = (1_000, 10_000, 100_000)
+LOOKUPS = 2_000
+
+
+def run(sizes=SIZES, lookups=LOOKUPS):
+    rng = random.Random(1)
+    for size in sizes:
+        loader = DataLoader(tables=build_catalog(size))
+        ids = [rng.randint(1, size) for _ in range(lookups)]
+
+        samples = []
+        for rid in ids:
+            start = time.perf_counter()
+            loader.get_recipe_by_id(str(rid))
+            samples.append((time.perf_counter() - start) * 1e6)
+
+        samples.sort()
+        print(
+            f"{size:>7} recipes: "
+            f"p50={statistics.median(samples):7.1f}us "
+            f"p99={samples[int(len(samples) * 0.99) - 1]:7.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    run()
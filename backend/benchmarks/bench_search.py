@@ -0,0 +1,35 @@
+"""Measure full-text search latency over a synthetic catalog.
+
+Run from the backend directory::
+
+    python -m benchmarks.bench_search
+"""
+import time
+
+from benchmarks.synthetic import build_catalog
+from services.data_loader import DataLoader
+
+SIZE = 50_000
+QUERIES = ["chicken", "chiken bowl", "tur", "spinach garlic", "quick salmon", "gluten free oats", "avocdo"]
+RUNS = 100
+
+
+def run(size=SIZE, runs=RUNS):
+    start = time.perf_counter()
+    index = DataLoader(tables=build_catalog(size)).search_index
+    print(f"{size} recipes: catalog + index built in {time.perf_counter() - start:.1f}s, "
+          f"{len(index.vocabulary)} terms")
+
+    for query in QUERIES:
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            docs, _ = index.search(query)
+            samples.append((time.perf_counter() - start) * 1e3)
+        samples.sort()
+        print(f"  {query!r:20} {len(docs):6} hits  p50={samples[len(samples) // 2]:.2f}ms "
+              f"p99={samples[int(len(samples) * 0.99) - 1]:.2f}ms")
+
+
+if __name__ == "__main__":
+    run()
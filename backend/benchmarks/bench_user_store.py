@@ -0,0 +1,81 @@
+"""Measure login throughput of the user store with parallel workers.
+
+Seeds a fresh SQLite store with 100k users, then has several processes (as
+gunicorn workers would) each run logins: a lookup-or-create of a random
+phone, a tenth of them new users. The old ``users.json`` read-modify-write
+is timed for comparison at the same size. Run from the backend directory::
+
+    python -m benchmarks.bench_user_store
+"""
+from multiprocessing import Pool
+import json
+import os
+import random
+import tempfile
+import time
+
+from services.user_store import SQLiteUserStore
+
+USERS = 100_000
+WORKERS = (1, 4, 8)
+LOGINS = 5_000
+LEGACY_LOGINS = 20
+
+
+def _phone(i):
+    return f"+1555{i:07d}"
+
+
+def _logins(args):
+    path, seed, count = args
+    store = SQLiteUserStore(path)
+    rng = random.Random(seed)
+    for _ in range(count):
+        if rng.random() < 0.1:
+            phone = _phone(USERS + rng.randrange(10 * USERS))
+        else:
+            phone = _phone(rng.randrange(USERS))
+        store.get_or_create(phone, f"User_{phone[-4:]}")
+    return count
+
+
+def _legacy_login(path, phone):
+    with open(path) as f:
+        users = json.load(f)
+    if phone not in users:
+        users[phone] = {"username": f"User_{phone[-4:]}", "phone": phone, "created_at": "2025-01-01T00:00:00"}
+        with open(path, "w") as f:
+            json.dump(users, f)
+
+
+def run(users=USERS, workers=WORKERS, logins=LOGINS):
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = os.path.join(tmp, "users.json")
+        with open(legacy, "w") as f:
+            json.dump({
+                _phone(i): {"username": f"User_{i}", "phone": _phone(i), "created_at": "2025-01-01T00:00:00"}
+                for i in range(users)
+            }, f)
+
+        path = os.path.join(tmp, "users.db")
+        start = time.perf_counter()
+        imported = SQLiteUserStore(path).migrate_json(legacy)
+        print(f"migrated {imported} users in {time.perf_counter() - start:.2f}s")
+
+        rng = random.Random(0)
+        start = time.perf_counter()
+        for _ in range(LEGACY_LOGINS):
+            _legacy_login(legacy, _phone(USERS + rng.randrange(USERS)))
+        elapsed = time.perf_counter() - start
+        print(f"users.json, 1 worker:  {LEGACY_LOGINS / elapsed:9.0f} logins/s")
+
+        for count in workers:
+            start = time.perf_counter()
+            with Pool(count) as pool:
+                done = sum(pool.map(_logins, [(path, seed, logins) for seed in range(count)]))
+            elapsed = time.perf_counter() - start
+            print(f"sqlite, {count} workers:   {done / elapsed:9.0f} logins/s")
+
+
+if __name__ == "__main__":
+    run()
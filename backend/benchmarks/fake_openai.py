@@ -0,0 +1,105 @@
+"""Minimal stand-in for the OpenAI chat completions API.
+
+Answers ``POST /v1/chat/completions`` after a fixed delay so chat load tests
+can run without network access or API spend. Point the backend at it with
+``OPENAI_BASE_URL=http://127.0.0.1:8765/v1``::
+
+    python -m benchmarks.fake_openai --port 8765 --latency 1.5
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import threading
+import time
+
+REPLY = "Swap the tortillas for lettuce wraps to cut carbs while keeping the protein the same."
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    latency = 1.0
+    first_token = 0.2
+    calls = 0
+    calls_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        with self.calls_lock:
+            type(self).calls += 1
+
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        if body.get("stream"):
+            self._stream(body)
+            return
+
+        time.sleep(self.latency)
+        completion = {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": REPLY},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+        payload = json.dumps(completion).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+    def _stream(self, body):
+        """Send REPLY word by word as chat.completion.chunk events, spread
+        over ``latency`` seconds after a ``first_token`` delay."""
+        words = REPLY.split(" ")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        time.sleep(self.first_token)
+        for i, word in enumerate(words):
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "gpt-4o-mini"),
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": word if i == 0 else " " + word},
+                    "finish_reason": None,
+                }],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(max(self.latency - self.first_token, 0) / len(words))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def serve(port=8765, latency=1.0, first_token=0.2):
+    """Start the fake server on a daemon thread and return it."""
+    handler = type("Handler", (FakeOpenAIHandler,), {"latency": latency, "first_token": first_token, "calls": 0})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=1.0, help="seconds to produce a full reply")
+    parser.add_argument("--first-token", type=float, default=0.2, help="seconds before the first streamed token")
+    args = parser.parse_args()
+    server = serve(args.port, args.latency, args.first_token)
+    print(f"Fake OpenAI listening on http://127.0.0.1:{args.port}/v1")
+    threading.Event().wait()
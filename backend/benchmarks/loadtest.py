@@ -0,0 +1,287 @@
+"""Concurrent load test of the Flask API against local stubs.
+
+Builds a synthetic catalog, writes it as a snapshot and starts the app in a
+separate process (``benchmarks.app_under_test``) that loads it instead of
+Supabase, with OpenAI, Instacart and Twilio answered by local stubs. Each
+scenario is then driven by ``--concurrency`` threads for ``--duration``
+seconds and reported as throughput and p50/p95/p99 latency.
+
+Results are saved to ``benchmarks/results/<time>-<commit>.json`` and
+compared with the latest earlier run at the same scale, so regressions show
+up between commits. Run from the backend directory::
+
+    python -m benchmarks.loadtest --recipes 10000 --concurrency 16 --duration 10
+    python -m benchmarks.loadtest --scenarios recipe,search --server gunicorn --workers 4
+"""
+import argparse
+import datetime
+import glob
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+from benchmarks import fake_openai, stub_instacart, stub_twilio
+from benchmarks.synthetic import WORDS, build_catalog
+from services.data_loader import DataLoader
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+MESSAGES = ["Can I make this vegetarian?", "How long does it keep?", "What can I swap for the rice?",
+            "Is this good for cutting?", "Can I freeze it?"]
+
+
+class Scenario:
+    """One request type; ``request(session, rng, state)`` returns a Response."""
+
+    def __init__(self, name, request):
+        self.name = name
+        self.request = request
+
+
+def _scenarios(recipes):
+    def recipe_id(rng):
+        return rng.randint(1, recipes)
+
+    def phone(rng):
+        return f"+1555{rng.randrange(10_000_000):07d}"
+
+    def authed(session, rng, state):
+        # update-username retires the token it was called with, so each
+        # thread carries the fresh one forward.
+        if "token" not in state:
+            login = session.post("/auth/verify-otp", json={"phone_number": phone(rng), "otp_code": "000000"})
+            state["token"] = login.json()["token"]
+        response = session.post(
+            "/auth/update-username", json={"username": f"user{rng.randrange(1000)}"},
+            headers={"Authorization": f"Bearer {state['token']}"},
+        )
+        if response.ok:
+            state["token"] = response.json()["token"]
+        return response
+
+    def plan(rng):
+        return {"targets": {"calories": rng.choice([1800, 2000, 2400]), "protein": rng.choice([120, 150, 180]),
+                            "carbs": 200, "fat": 60}, "days": 7}
+
+    return [
+        Scenario("recipes", lambda s, rng, state: s.get("/recipes")),
+        Scenario("recipe", lambda s, rng, state: s.get(f"/recipe/{recipe_id(rng)}")),
+        Scenario("search", lambda s, rng, state: s.get(
+            "/search", params={"q": " ".join(rng.sample(WORDS, rng.randint(1, 2))), "limit": 20})),
+        Scenario("filter", lambda s, rng, state: s.get(
+            "/recipes/filter", params={"min_protein": rng.randint(10, 50), "limit": 20})),
+        Scenario("plan", lambda s, rng, state: s.post("/plan", json=plan(rng))),
+        Scenario("shopping_list", lambda s, rng, state: s.post("/shopping-list", json={
+            "recipes": [{"recipe_id": recipe_id(rng), "servings": 4} for _ in range(5)]})),
+        Scenario("chat", lambda s, rng, state: s.post(
+            f"/recipe/{recipe_id(rng)}/chat", json={"message": rng.choice(MESSAGES)})),
+        Scenario("auth", lambda s, rng, state: s.post(
+            "/auth/verify-otp", json={"phone_number": phone(rng), "otp_code": "000000"})),
+        Scenario("authed", authed),
+    ]
+
+
+class BaseURLSession(requests.Session):
+    def __init__(self, base_url):
+        super().__init__()
+        self.base_url = base_url
+
+    def request(self, method, url, *args, **kwargs):
+        return super().request(method, self.base_url + url, *args, **kwargs)
+
+
+def _percentile(samples, q):
+    return samples[min(int(q * len(samples)), len(samples) - 1)] if samples else None
+
+
+def run_scenario(base_url, scenario, concurrency, duration, warmup):
+    """Drive ``scenario`` from ``concurrency`` threads; returns a stats dict."""
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    start_at = time.perf_counter() + warmup
+    stop_at = start_at + duration
+
+    def worker(i):
+        rng = random.Random(i)
+        state = {}
+        with BaseURLSession(base_url) as session:
+            while True:
+                started = time.perf_counter()
+                if started >= stop_at:
+                    return
+                try:
+                    ok = scenario.request(session, rng, state).ok
+                except (requests.RequestException, ValueError, KeyError):
+                    ok = False
+                elapsed = time.perf_counter() - started
+                if started >= start_at:
+                    latencies[i].append(elapsed * 1e3)
+                    errors[i] += not ok
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    samples = sorted(ms for per_thread in latencies for ms in per_thread)
+    return {
+        "requests": len(samples),
+        "errors": sum(errors),
+        "throughput": round(len(samples) / duration, 1),
+        "p50_ms": round(_percentile(samples, 0.50), 2) if samples else None,
+        "p95_ms": round(_percentile(samples, 0.95), 2) if samples else None,
+        "p99_ms": round(_percentile(samples, 0.99), 2) if samples else None,
+    }
+
+
+def _commit():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return "unknown"
+    return f"{sha}-dirty" if dirty else sha or "unknown"
+
+
+def _previous(scale):
+    """The latest saved run with the same catalog scale, if any."""
+    for path in sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json")), reverse=True):
+        with open(path) as f:
+            result = json.load(f)
+        if result.get("scale") == scale:
+            return result
+    return None
+
+
+def _start_server(args, env):
+    if args.server == "gunicorn":
+        command = [sys.executable, "-m", "gunicorn", "benchmarks.app_under_test:app",
+                   "--bind", f"127.0.0.1:{args.port}", "--workers", str(args.workers),
+                   "--worker-class", "gthread", "--threads", str(args.threads)]
+    else:
+        command = [sys.executable, "-m", "benchmarks.app_under_test"]
+    server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.time() + 300
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with status {server.returncode}")
+        try:
+            if requests.get(f"http://127.0.0.1:{args.port}/recipe/1", timeout=1).ok:
+                return server
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("Server did not come up")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipes", type=int, default=10_000)
+    parser.add_argument("--ingredients", type=int, default=2_000)
+    parser.add_argument("--nutrients", type=int, default=7)
+    parser.add_argument("--tags", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10, help="seconds measured per scenario")
+    parser.add_argument("--warmup", type=float, default=1, help="seconds run before measuring")
+    parser.add_argument("--scenarios", default="all", help="comma-separated scenario names")
+    parser.add_argument("--server", choices=("werkzeug", "gunicorn"), default="werkzeug")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    parser.add_argument("--threads", type=int, default=8, help="threads per gunicorn worker")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--openai-latency", type=float, default=0.5)
+    parser.add_argument("--upstream-latency", type=float, default=0.05, help="Instacart and Twilio stub delay")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    scenarios = _scenarios(args.recipes)
+    if args.scenarios != "all":
+        wanted = set(args.scenarios.split(","))
+        scenarios = [s for s in scenarios if s.name in wanted]
+
+    scale = {"recipes": args.recipes, "ingredients": args.ingredients,
+             "nutrients": max(args.nutrients, 7), "tags": max(args.tags, 10)}
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    start = time.perf_counter()
+    loader = DataLoader(tables=build_catalog(
+        args.recipes, args.ingredients, num_nutrients=args.nutrients, num_tags=args.tags))
+    loader.write_snapshot(os.path.join(workdir, "snapshot"), "synthetic")
+    print(f"Catalog {scale} built in {time.perf_counter() - start:.1f}s")
+
+    stubs = [
+        fake_openai.serve(args.port + 1, latency=args.openai_latency),
+        stub_instacart.serve(args.port + 2, latency=args.upstream_latency),
+        stub_twilio.serve(args.port + 3, latency=args.upstream_latency),
+    ]
+    env = dict(
+        os.environ,
+        PORT=str(args.port),
+        CATALOG_SNAPSHOT_PATH=os.path.join(workdir, "snapshot"),
+        CATALOG_REFRESH_INTERVAL="0",
+        OPENAI_API_KEY="loadtest",
+        OPENAI_BASE_URL=f"http://127.0.0.1:{args.port + 1}/v1",
+        INSTACART_API_KEY="loadtest",
+        INSTACART_BASE_URL=f"http://127.0.0.1:{args.port + 2}",
+        TWILIO_STUB_URL=f"http://127.0.0.1:{args.port + 3}",
+        TWILIO_VERIFY_SERVICE_SID="VA0",
+        JWT_SECRET="loadtest-secret-with-at-least-32-bytes",
+        USER_DB_PATH=os.path.join(workdir, "users.db"),
+        USERS_JSON_PATH=os.path.join(workdir, "users.json"),
+        RATE_LIMIT_DB_PATH=os.path.join(workdir, "rate_limit.db"),
+        OTP_SENDS_PER_PHONE="1000000",
+        OTP_SENDS_PER_IP="1000000",
+    )
+    server = _start_server(args, env)
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    results = {}
+    try:
+        for scenario in scenarios:
+            results[scenario.name] = run_scenario(base_url, scenario, args.concurrency, args.duration, args.warmup)
+    finally:
+        server.terminate()
+        server.wait()
+        for stub in stubs:
+            stub.shutdown()
+
+    previous = _previous(scale)
+    print(f"\n{'scenario':>14} {'req/s':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7}  vs {previous['commit'] if previous else '-'}")
+    for name, stats in results.items():
+        line = (f"{name:>14} {stats['throughput']:>9.1f} {stats['p50_ms'] or 0:>7.1f}ms "
+                f"{stats['p95_ms'] or 0:>7.1f}ms {stats['p99_ms'] or 0:>7.1f}ms {stats['errors']:>7}")
+        before = previous["results"].get(name) if previous else None
+        if before and before.get("p50_ms") and stats["p50_ms"] and before["throughput"]:
+            line += (f"  p50 {100 * (stats['p50_ms'] / before['p50_ms'] - 1):+.0f}%"
+                     f"  req/s {100 * (stats['throughput'] / before['throughput'] - 1):+.0f}%")
+        print(line)
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        commit = _commit()
+        report = {
+            "commit": commit,
+            "created_at": datetime.datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "scale": scale,
+            "settings": {k: getattr(args, k) for k in ("concurrency", "duration", "server", "workers", "threads",
+                                                        "openai_latency", "upstream_latency")},
+            "results": results,
+        }
+        path = os.path.join(RESULTS_DIR, f"{datetime.datetime.utcnow():%Y%m%dT%H%M%S}-{commit}.json")
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Local stand-in for the Instacart shopping list API.
+
+Answers ``POST /shopping_list`` with a fake link after a fixed delay, and can
+fail the first few requests with 503 to exercise the client's retries. Point
+the backend at it with ``INSTACART_BASE_URL=http://127.0.0.1:8766``::
+
+    python -m benchmarks.stub_instacart --port 8766 --latency 0.2 --fail-first 1
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import threading
+import time
+
+
+class StubInstacartHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is visible
+    latency = 0.1
+    fail_first = 0
+    calls = 0
+    connections = 0
+    payloads = []
+    calls_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.calls_lock:
+            type(self).connections += 1
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        with self.calls_lock:
+            type(self).calls += 1
+            failing = type(self).calls <= self.fail_first
+            if not failing:
+                self.payloads.append(body)
+
+        if not self.path.endswith("/shopping_list"):
+            self._reply(404, {"error": "not found"})
+        elif not self.headers.get("Authorization", "").startswith("Bearer "):
+            self._reply(401, {"error": "unauthorized"})
+        elif failing:
+            self._reply(503, {"error": "try again"})
+        else:
+            time.sleep(self.latency)
+            self._reply(200, {"shopping_list_url": f"https://instacart.example/list/{self.calls}"})
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def serve(port=8766, latency=0.1, fail_first=0):
+    """Start the stub on a daemon thread and return it."""
+    handler = type("Handler", (StubInstacartHandler,), {
+        "latency": latency, "fail_first": fail_first, "calls": 0, "connections": 0, "payloads": [],
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds before each reply")
+    parser.add_argument("--fail-first", type=int, default=0, help="answer this many requests with 503")
+    args = parser.parse_args()
+    server = serve(args.port, args.latency, args.fail_first)
+    print(f"Stub Instacart listening on http://127.0.0.1:{args.port}")
+    threading.Event().wait()
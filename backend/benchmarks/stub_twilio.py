@@ -0,0 +1,69 @@
+"""Local stand-in for the Twilio Verify API.
+
+Answers verification sends with ``pending`` and every code check with
+``approved`` after a fixed delay. The Twilio SDK has no base-URL setting, so
+``StubTwilioHttpClient`` rewrites its requests to the stub instead::
+
+    from twilio.rest import Client
+    client = Client("AC0", "token", http_client=StubTwilioHttpClient("http://127.0.0.1:8767"))
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+import json
+import threading
+import time
+
+from twilio.http.http_client import TwilioHttpClient
+
+
+class StubTwilioHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.05
+    calls = 0
+    calls_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.calls_lock:
+            type(self).calls += 1
+        time.sleep(self.latency)
+
+        if self.path.endswith("/Verifications"):
+            payload = {"sid": "VE0", "status": "pending", "channel": "sms"}
+        elif self.path.endswith("/VerificationCheck"):
+            payload = {"sid": "VE0", "status": "approved", "valid": True}
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        data = json.dumps(payload).encode()
+        self.send_response(201)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StubTwilioHttpClient(TwilioHttpClient):
+    """Twilio HTTP client that sends every request to ``base_url``."""
+
+    def __init__(self, base_url, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url.rstrip("/")
+
+    def request(self, method, url, *args, **kwargs):
+        parts = urlsplit(url)
+        return super().request(method, f"{self.base_url}{parts.path}", *args, **kwargs)
+
+
+def serve(port=8767, latency=0.05):
+    """Start the stub on a daemon thread and return it."""
+    handler = type("Handler", (StubTwilioHandler,), {"latency": latency, "calls": 0})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
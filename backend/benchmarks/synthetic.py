@@ -0,0 +1,124 @@
+"""Synthetic catalog generator used by the benchmark scripts.
+
+Produces the same table shapes DataLoader reads from Supabase so a loader can
+be built with ``DataLoader(tables=build_catalog(n))`` without any network.
+"""
+import random
+
+NUTRIENTS = [
+    ("Calories", "kcal"),
+    ("Protein", "g"),
+    ("Carbs", "g"),
+    ("Fat", "g"),
+    ("Fiber", "g"),
+    ("Sugar", "g"),
+    ("Sodium", "mg"),
+]
+
+DIET_PLANS = ["High-Protein", "Low-Carb", "Vegetarian", "Vegan", "Keto", "Paleo"]
+
+TAGS = ["Budget", "Quick", "Freezer-Friendly", "One-Pan", "Spicy", "Kid-Friendly",
+        "Gluten-Free", "Dairy-Free", "Meal-Prep", "Comfort"]
+
+UNITS = ["g", "oz", "lb", "cup", "tbsp", "tsp", "unit"]
+
+WORDS = ["chicken", "turkey", "beef", "tofu", "salmon", "shrimp", "rice", "quinoa",
+         "oat", "egg", "bean", "lentil", "pepper", "onion", "garlic", "spinach",
+         "kale", "tomato", "avocado", "yogurt", "cheese", "potato", "broccoli",
+         "mushroom", "lime", "ginger", "cinnamon", "honey", "peanut", "coconut"]
+
+STYLES = ["Bowl", "Burrito", "Stir-Fry", "Salad", "Skillet", "Wrap", "Bake",
+          "Curry", "Soup", "Tacos", "Oats", "Pasta"]
+
+
+def build_catalog(num_recipes=1000, num_ingredients=500, ingredients_per_recipe=8,
+                  tags_per_recipe=3, steps_per_recipe=4, seed=0, num_nutrients=None, num_tags=None):
+    """Return a dict of table rows keyed by DataLoader attribute name.
+
+    ``num_nutrients`` and ``num_tags`` extend the named nutrients and tags
+    with generic ones ("Nutrient 8", "Tag 11", ...) to test wider catalogs.
+    """
+    rng = random.Random(seed)
+    nutrients = NUTRIENTS + [(f"Nutrient {i}", "mg") for i in range(len(NUTRIENTS) + 1, (num_nutrients or 0) + 1)]
+    tags = TAGS + [f"Tag {i}" for i in range(len(TAGS) + 1, (num_tags or 0) + 1)]
+
+    ingredients_library = [
+        {"ingredient_id": i, "name": f"{rng.choice(WORDS).title()} {i}"}
+        for i in range(1, num_ingredients + 1)
+    ]
+    nutrient_library = [
+        {"nutrient_id": i, "name": name, "unit": unit}
+        for i, (name, unit) in enumerate(nutrients, start=1)
+    ]
+    diet_plans = [{"diet_plan_id": i, "name": name} for i, name in enumerate(DIET_PLANS, start=1)]
+    tags_library = [{"tag_id": i, "tag_name": name} for i, name in enumerate(tags, start=1)]
+
+    recipes = []
+    recipe_ingredients = []
+    recipe_nutrition = []
+    recipe_diet_plan = []
+    recipe_tags = []
+    instructions = []
+    meal_prep_tips = []
+
+    for rid in range(1, num_recipes + 1):
+        name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {rng.choice(STYLES)}"
+        recipes.append({
+            "recipe_id": rid,
+            "name": name,
+            "short_name": name,
+            "cuisine": rng.choice(["American", "Mexican", "Italian", "Thai", "Indian"]),
+            "meal_type": rng.choice(["Breakfast", "Lunch", "Dinner", "Snack"]),
+            "servings": rng.randint(1, 6),
+            "prep_time": rng.randint(5, 30),
+            "cook_time": rng.randint(5, 60),
+        })
+
+        for ingredient_id in rng.sample(range(1, num_ingredients + 1), ingredients_per_recipe):
+            recipe_ingredients.append({
+                "recipe_id": rid,
+                "ingredient_id": ingredient_id,
+                "amount": round(rng.uniform(0.25, 4), 2),
+                "unit": rng.choice(UNITS),
+            })
+
+        protein = rng.uniform(5, 60)
+        carbs = rng.uniform(0, 90)
+        fat = rng.uniform(2, 40)
+        values = [protein * 4 + carbs * 4 + fat * 9, protein, carbs, fat,
+                  rng.uniform(0, 15), rng.uniform(0, 30), rng.uniform(50, 1500)]
+        values += [rng.uniform(0, 100) for _ in nutrients[len(NUTRIENTS):]]
+        for nutrient_id, value in enumerate(values, start=1):
+            recipe_nutrition.append({"recipe_id": rid, "nutrient_id": nutrient_id, "value": round(value, 1)})
+
+        recipe_diet_plan.append({"recipe_id": rid, "diet_plan_id": rng.randint(1, len(DIET_PLANS))})
+        for tag_id in rng.sample(range(1, len(tags) + 1), tags_per_recipe):
+            recipe_tags.append({"recipe_id": rid, "tag_id": tag_id})
+
+        for step in range(1, steps_per_recipe + 1):
+            instructions.append({
+                "instruction_id": len(instructions) + 1,
+                "recipe_id": rid,
+                "step_number": step,
+                "instruction_text": f"Step {step} for {name}.",
+            })
+        meal_prep_tips.append({
+            "tip_id": rid,
+            "recipe_id": rid,
+            "storage_type": "Refrigeration",
+            "details": "Keeps for 4 days in an airtight container.",
+        })
+
+    return {
+        "recipes": recipes,
+        "ingredients_library": ingredients_library,
+        "recipe_ingredients": recipe_ingredients,
+        "nutrient_library": nutrient_library,
+        "recipe_nutrition": recipe_nutrition,
+        "diet_plans": diet_plans,
+        "recipe_diet_plan": recipe_diet_plan,
+        "tags_library": tags_library,
+        "recipe_tags": recipe_tags,
+        "instructions": instructions,
+        "meal_prep_tips": meal_prep_tips,
+    }
@@ -5,6 +5,78 @@ load_dotenv()
 
 class Config:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # Point at a local fake server for load tests
+    OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "30"))
+    OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "1"))
+    OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+    CHAT_WAIT_TIMEOUT = float(os.getenv("CHAT_WAIT_TIMEOUT", "60"))
+    CHAT_CACHE_SIZE = int(os.getenv("CHAT_CACHE_SIZE", "2048"))
+    CHAT_CACHE_TTL = float(os.getenv("CHAT_CACHE_TTL", "3600"))
+    CHAT_CONTEXT_TOKENS = int(os.getenv("CHAT_CONTEXT_TOKENS", "300"))  # Recipe context budget per prompt
     INSTACART_API_KEY = os.getenv("INSTACART_API_KEY", "your-default-api-key")  # Replace with your actual API key
+    INSTACART_BASE_URL = os.getenv("INSTACART_BASE_URL", "https://api.instacart.com/v2")  # Point at a stub for tests
+    INSTACART_CONNECT_TIMEOUT = float(os.getenv("INSTACART_CONNECT_TIMEOUT", "3"))
+    INSTACART_TIMEOUT = float(os.getenv("INSTACART_TIMEOUT", "10"))
+    INSTACART_MAX_RETRIES = int(os.getenv("INSTACART_MAX_RETRIES", "2"))
+    INSTACART_BACKOFF = float(os.getenv("INSTACART_BACKOFF", "0.3"))
+    INSTACART_POOL_SIZE = int(os.getenv("INSTACART_POOL_SIZE", "10"))
+    SHOPPING_LIST_CACHE_SIZE = int(os.getenv("SHOPPING_LIST_CACHE_SIZE", "1024"))
+    SHOPPING_LIST_CACHE_TTL = float(os.getenv("SHOPPING_LIST_CACHE_TTL", "3600"))
     SUPABASE_URL = os.getenv("SUPABASE_URL")
     SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+
+    # Defer fetching the catalog until the first request that needs it
+    DATA_LOADER_LAZY = os.getenv("DATA_LOADER_LAZY", "false").lower() == "true"
+    DATA_LOADER_WORKERS = int(os.getenv("DATA_LOADER_WORKERS", "8"))
+    # Rows per range request; keep at or below PostgREST's max-rows
+    SUPABASE_PAGE_SIZE = int(os.getenv("SUPABASE_PAGE_SIZE", "1000"))
+
+    # Directory of a catalog snapshot to start from instead of Supabase
+    # (build with ``python -m services.snapshot``); unset to always fetch
+    CATALOG_SNAPSHOT_PATH = os.getenv("CATALOG_SNAPSHOT_PATH")
+
+    # Seconds between incremental catalog refreshes (0 disables the refresher)
+    CATALOG_REFRESH_INTERVAL = float(os.getenv("CATALOG_REFRESH_INTERVAL", "0"))
+    CATALOG_WATERMARK_COLUMN = os.getenv("CATALOG_WATERMARK_COLUMN", "updated_at")
+
+    # SQLite user store; users.json is imported into it once on first start
+    USER_DB_PATH = os.getenv("USER_DB_PATH", "data/users.db")
+    USERS_JSON_PATH = os.getenv("USERS_JSON_PATH", "data/users.json")
+    USER_DB_TIMEOUT = float(os.getenv("USER_DB_TIMEOUT", "5"))
+
+    JWT_SECRET = os.getenv("JWT_SECRET", "your-secret-key")
+    AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))  # Recently verified tokens
+
+    # OTP sends allowed per phone and per client IP in each window, and the
+    # window in which repeat sends for a phone reuse the pending code
+    OTP_SENDS_PER_PHONE = int(os.getenv("OTP_SENDS_PER_PHONE", "5"))
+    OTP_SENDS_PER_IP = int(os.getenv("OTP_SENDS_PER_IP", "20"))
+    OTP_RATE_WINDOW = float(os.getenv("OTP_RATE_WINDOW", "3600"))
+    OTP_COOLDOWN = float(os.getenv("OTP_COOLDOWN", "30"))
+    TWILIO_TIMEOUT = float(os.getenv("TWILIO_TIMEOUT", "10"))
+    TWILIO_MAX_RETRIES = int(os.getenv("TWILIO_MAX_RETRIES", "1"))
+    # "memory" limits per process; "sqlite" shares limits across workers
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    RATE_LIMIT_DB_PATH = os.getenv("RATE_LIMIT_DB_PATH", "data/rate_limit.db")
+    RATE_LIMIT_DB_TIMEOUT = float(os.getenv("RATE_LIMIT_DB_TIMEOUT", "5"))
+    RATE_LIMIT_PRUNE_EVERY = int(os.getenv("RATE_LIMIT_PRUNE_EVERY", "10000"))
+    # Reverse proxies in front of the app whose X-Forwarded-For to trust: 1 for
+    # the Heroku router the Procfile targets; 0 when clients connect directly
+    TRUSTED_PROXIES = int(os.getenv("TRUSTED_PROXIES", "1"))
+
+    # Shared secret for /admin endpoints; they are disabled when unset
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+    # Serialized responses for the read-only catalog endpoints
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    RESPONSE_CACHE_GZIP = os.getenv("RESPONSE_CACHE_GZIP", "true").lower() == "true"
+
+    # Bearer token required to scrape /metrics; the endpoint is disabled when unset
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    # Dump sampled stacks of requests slower than this many ms (0 disables;
+    # also switchable at runtime through /admin/profile)
+    PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "0"))
+    PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))  # Seconds between stack samples
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "data/profiles")
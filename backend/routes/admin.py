@@ -0,0 +1,49 @@
+from flask import Blueprint, jsonify, request
+from config import Config
+from services import metrics
+from services.data_loader import get_data_loader
+import hmac
+import logging
+
+admin_bp = Blueprint("admin", __name__)
+data_loader = get_data_loader()
+
+def _authorized():
+    token = request.headers.get("X-Admin-Token", "")
+    return bool(Config.ADMIN_TOKEN) and hmac.compare_digest(token, Config.ADMIN_TOKEN)
+
+@admin_bp.route("/admin/reload", methods=["POST"])
+def reload_catalog():
+    """Pull catalog changes from Supabase now; ?full=true re-fetches everything."""
+    if not _authorized():
+        return jsonify({"error": "Forbidden"}), 403
+
+    try:
+        if request.args.get("full", "").lower() == "true":
+            data_loader.reload()
+            changed = True
+        else:
+            changed = data_loader.refresh()
+        return jsonify({"changed": changed, "version": data_loader.version}), 200
+    except Exception as e:
+        logging.error(f"Error in /admin/reload: {e}")
+        return jsonify({"error": "Catalog reload failed"}), 500
+
+@admin_bp.route("/admin/profile", methods=["POST"])
+def profile_slow_requests():
+    """Sample requests slower than ?threshold_ms=N into PROFILE_DIR; 0 stops.
+
+    Applies to the worker process that serves this call only.
+    """
+    if not _authorized():
+        return jsonify({"error": "Forbidden"}), 403
+
+    try:
+        threshold_ms = float(request.args.get("threshold_ms", Config.PROFILE_SLOW_MS))
+    except ValueError:
+        return jsonify({"error": "Invalid threshold_ms"}), 400
+    if threshold_ms < 0:
+        return jsonify({"error": "Invalid threshold_ms"}), 400
+
+    metrics.profiler.configure(threshold_ms)
+    return jsonify({"threshold_ms": threshold_ms, "directory": metrics.profiler.directory}), 200
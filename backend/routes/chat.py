@@ -1,18 +1,58 @@
-from flask import Blueprint, jsonify, request
-from services.data_loader import DataLoader
-from services.openai_service import OpenAIService
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from services.data_loader import get_data_loader
+from services.openai_service import OpenAIService, StreamInterrupted
+import json
 
 chat_bp = Blueprint("chat", __name__)
-data_loader = DataLoader()
+data_loader = get_data_loader()
+
+def _wants_stream(data):
+    if str(request.args.get("stream", data.get("stream", ""))).lower() in ("1", "true"):
+        return True
+    return request.accept_mimetypes.best == "text/event-stream"
+
+def _sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
 
 @chat_bp.route("/recipe/<int:recipe_id>/chat", methods=["POST"])
 def recipe_chat(recipe_id):
-    data = request.get_json()
-    user_message = data.get("message", "")
+    """Answer a question about a recipe.
+
+    Returns ``{"response": ...}`` by default. With ``?stream=true`` (or
+    ``"stream": true`` in the body, or ``Accept: text/event-stream``) the
+    answer is sent as server-sent events: one ``token`` event per chunk,
+    then a ``done`` event carrying the same ``{"response": ...}`` body. If
+    the answer is cut off midway the stream ends with an ``error`` event
+    carrying the partial text instead of ``done``.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        data = {}
+    user_message = data.get("message")
+    if not isinstance(user_message, str) or not user_message.strip():
+        return jsonify({"error": "A non-empty message is required"}), 400
 
-    recipe_details = data_loader.get_recipe_by_id(recipe_id)
-    if not recipe_details:
+    context = data_loader.prompt_contexts.get(recipe_id)
+    if context is None:
         return jsonify({"error": "Recipe not found"}), 404
 
-    ai_response = OpenAIService.chat_with_ai(user_message, recipe_details)
-    return jsonify({"response": ai_response})
+    if not _wants_stream(data):
+        ai_response = OpenAIService.chat_with_ai(user_message, recipe_id, context)
+        return jsonify({"response": ai_response})
+
+    def events():
+        parts = []
+        try:
+            for token in OpenAIService.stream_chat(user_message, recipe_id, context):
+                parts.append(token)
+                yield _sse("token", {"token": token})
+        except StreamInterrupted:
+            yield _sse("error", {"error": "Response was interrupted", "response": "".join(parts)})
+            return
+        yield _sse("done", {"response": "".join(parts)})
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,4 +1,5 @@
 from flask import Blueprint, request, jsonify
+from routes.shopping_list import shopping_list_response
 from services.instacart_service import InstacartService
 import logging
 
@@ -11,7 +12,7 @@ def generate_shopping_list():
     """
     try:
         data = request.json
-        logging.info(f"Received payload: {data}")  # Log the incoming payload
+        logging.debug(f"Received payload: {data}")
 
         ingredients = data.get("ingredients", [])
         if not ingredients:
@@ -27,3 +28,16 @@ def generate_shopping_list():
     except Exception as e:
         logging.error(f"Error in /instacart/shopping-list: {e}")
         return jsonify({"error": "Internal server error"}), 500
+
+
+@instacart_bp.route("/instacart/shopping-list/batch", methods=["POST"])
+def generate_batch_shopping_list():
+    """
+    Build one shopping list link for several recipes.
+
+    Body: ``{"recipes": [{"recipe_id": 1, "servings": 4}, {"recipe_id": 2, "multiplier": 2}]}``.
+    Ingredients shared between recipes are scaled, merged and sent to
+    Instacart in a single call.
+    """
+    data = request.get_json(silent=True) or {}
+    return shopping_list_response(data.get("recipes"), send_to_instacart=True)
@@ -0,0 +1,75 @@
+from flask import Blueprint, Response, jsonify
+from config import Config
+from services import metrics
+from services.auth import bearer_token, verifier
+from services.data_loader import get_data_loader
+from services.openai_service import OpenAIService
+from services.response_cache import response_cache
+from services import shopping_list
+import hmac
+import threading
+
+metrics_bp = Blueprint("metrics", __name__)
+data_loader = get_data_loader()
+
+CACHES = {
+    "response": response_cache,
+    "chat": OpenAIService.cache,
+    "shopping_list": shopping_list.cache,
+    "auth_token": verifier.cache,
+}
+
+# Catalog size by version; measured once per snapshot
+_catalog_size = {}
+_catalog_size_lock = threading.Lock()
+
+
+def _cache_samples(stat):
+    return [({"cache": name}, getattr(cache, stat)) for name, cache in CACHES.items()]
+
+
+def _hit_ratios():
+    samples = []
+    for name, cache in CACHES.items():
+        lookups = cache.hits + cache.misses
+        samples.append(({"cache": name}, cache.hits / lookups if lookups else 0.0))
+    return samples
+
+
+def _catalog_memory():
+    catalog = data_loader.catalog
+    with _catalog_size_lock:
+        if _catalog_size.get("version") != catalog.version:
+            rows, arrays = metrics.catalog_size(catalog)
+            _catalog_size.update(version=catalog.version, rows=rows, arrays=arrays)
+        return [({"part": "rows"}, _catalog_size["rows"]), ({"part": "arrays"}, _catalog_size["arrays"])]
+
+
+def _catalog_rows():
+    catalog = data_loader.catalog
+    return [({"table": name}, len(getattr(catalog, name))) for name in catalog.indexes]
+
+
+for metric in (
+    metrics.Sampled("cache_hits_total", "Lookups answered from each in-process cache.", "counter",
+                    lambda: _cache_samples("hits")),
+    metrics.Sampled("cache_misses_total", "Lookups each in-process cache could not answer.", "counter",
+                    lambda: _cache_samples("misses")),
+    metrics.Sampled("cache_hit_ratio", "Hits over lookups since the process started.", "gauge", _hit_ratios),
+    metrics.Sampled("cache_entries", "Entries held by each in-process cache.", "gauge",
+                    lambda: [({"cache": name}, len(cache.entries)) for name, cache in CACHES.items()]),
+    metrics.Sampled("catalog_version", "Version of the catalog snapshot being served.", "gauge",
+                    lambda: [({}, data_loader.version)]),
+    metrics.Sampled("catalog_rows", "Rows per catalog table.", "gauge", _catalog_rows),
+    metrics.Sampled("catalog_memory_bytes", "Approximate size of the catalog table rows (sampled) and "
+                    "of its NumPy arrays.", "gauge", _catalog_memory),
+):
+    metrics.register(metric)
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Timings, cache and catalog stats of this process in Prometheus text format."""
+    if not Config.METRICS_TOKEN or not hmac.compare_digest(bearer_token() or "", Config.METRICS_TOKEN):
+        return jsonify({"error": "Forbidden"}), 403
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
@@ -1,10 +1,13 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, g, request, jsonify
 from twilio.rest import Client
+from twilio.http.http_client import TwilioHttpClient
 from dotenv import load_dotenv
+from config import Config
+from services import metrics
+from services.auth import require_auth, verifier
+from services.rate_limit import RateLimiter, get_backend
+from services.user_store import get_user_store
 import os
-import jwt
-import datetime
-import json
 
 load_dotenv()
 
@@ -12,23 +15,25 @@ otp = Blueprint('otp', __name__)
 twilio_sid = os.getenv("TWILIO_ACCOUNT_SID")
 twilio_auth = os.getenv("TWILIO_AUTH_TOKEN")
 twilio_verify_sid = os.getenv("TWILIO_VERIFY_SERVICE_SID")
-jwt_secret = os.getenv("JWT_SECRET", "your-secret-key")
 
-# Simple in-memory user storage (replace with database in production)
-USERS_FILE = "data/users.json"
+# One client per process; its session keeps connections to Twilio alive
+client = Client(twilio_sid, twilio_auth, http_client=TwilioHttpClient(
+    pool_connections=True,
+    timeout=Config.TWILIO_TIMEOUT,
+    max_retries=Config.TWILIO_MAX_RETRIES
+))
+users = get_user_store()
 
-def load_users():
-    if os.path.exists(USERS_FILE):
-        with open(USERS_FILE, 'r') as f:
-            return json.load(f)
-    return {}
+limits = get_backend()
+phone_limiter = RateLimiter(limits, "otp-phone", Config.OTP_SENDS_PER_PHONE, Config.OTP_RATE_WINDOW)
+ip_limiter = RateLimiter(limits, "otp-ip", Config.OTP_SENDS_PER_IP, Config.OTP_RATE_WINDOW)
+# One real send per phone per cooldown; repeats get the pending status back
+recent_sends = RateLimiter(limits, "otp-sent", 1, Config.OTP_COOLDOWN)
 
-def save_users(users):
-    os.makedirs(os.path.dirname(USERS_FILE), exist_ok=True)
-    with open(USERS_FILE, 'w') as f:
-        json.dump(users, f)
-
-client = Client(twilio_sid, twilio_auth)
+def _too_many(retry_after):
+    response = jsonify({"error": "Too many requests", "retryAfter": retry_after})
+    response.headers["Retry-After"] = str(retry_after)
+    return response, 429
 
 @otp.route("/auth/send-otp", methods=["POST"])
 def send_otp():
@@ -37,13 +42,30 @@ def send_otp():
     if not phone:
         return jsonify({"error": "Missing phone_number"}), 400
 
+    # A code is already on its way (or being requested) for this phone.
+    if not recent_sends.hit(phone)[0]:
+        return jsonify({"status": "pending"}), 200
+
+    # IP first, so a denied address never spends the phone's sends. Without
+    # a client address only the per-phone limit applies.
+    checks = [(phone_limiter, phone)]
+    if request.remote_addr:
+        checks.insert(0, (ip_limiter, request.remote_addr))
+    for limiter, key in checks:
+        allowed, retry_after = limiter.hit(key)
+        if not allowed:
+            recent_sends.reset(phone)
+            return _too_many(retry_after)
+
     try:
-        verification = client.verify.v2.services(twilio_verify_sid).verifications.create(
-            to=phone,
-            channel="sms"
-        )
+        with metrics.timed(metrics.upstream_seconds, service="twilio", operation="send_otp"):
+            verification = client.verify.v2.services(twilio_verify_sid).verifications.create(
+                to=phone,
+                channel="sms"
+            )
         return jsonify({"status": verification.status}), 200
     except Exception as e:
+        recent_sends.reset(phone)
         return jsonify({"error": str(e)}), 500
 
 @otp.route("/auth/verify-otp", methods=["POST"])
@@ -57,45 +79,27 @@ def verify_otp():
         return jsonify({"error": "Missing phone_number or otp_code"}), 400
 
     try:
-        verification_check = client.verify.v2.services(twilio_verify_sid).verification_checks.create(
-            to=phone,
-            code=code
-        )
+        with metrics.timed(metrics.upstream_seconds, service="twilio", operation="verify_otp"):
+            verification_check = client.verify.v2.services(twilio_verify_sid).verification_checks.create(
+                to=phone,
+                code=code
+            )
         if verification_check.status == "approved":
-            # Load existing users
-            users = load_users()
-            
-            # If username is provided, update or create user
+            # If username is provided, update or create user; otherwise
+            # use the existing user or create one with a default name
             if username:
-                users[phone] = {
-                    "username": username,
-                    "phone": phone,
-                    "created_at": datetime.datetime.utcnow().isoformat()
-                }
-                save_users(users)
+                user = users.upsert(phone, username)
             else:
-                # If no username provided, use existing or generate default
-                if phone not in users:
-                    users[phone] = {
-                        "username": f"User_{phone[-4:]}",
-                        "phone": phone,
-                        "created_at": datetime.datetime.utcnow().isoformat()
-                    }
-                    save_users(users)
-            
+                user = users.get_or_create(phone, f"User_{phone[-4:]}")
+
             # Generate JWT token
-            token = jwt.encode({
-                'user_id': phone,
-                'phone': phone,
-                'username': users[phone]["username"],
-                'exp': datetime.datetime.utcnow() + datetime.timedelta(days=30)  # Extended to 30 days
-            }, jwt_secret, algorithm='HS256')
-            
+            token = verifier.issue(phone, user["username"])
+
             return jsonify({
                 "success": True,
                 "token": token,
                 "user_id": phone,
-                "user_name": users[phone]["username"]
+                "user_name": user["username"]
             }), 200
         else:
             return jsonify({"success": False, "status": verification_check.status}), 401
@@ -103,34 +107,38 @@ def verify_otp():
         return jsonify({"error": str(e)}), 500
 
 @otp.route("/auth/update-username", methods=["POST"])
+@require_auth
 def update_username():
-    data = request.get_json()
-    phone = data.get("phone_number")
+    """Rename the user the bearer token belongs to."""
+    data = request.get_json() or {}
+    phone = g.user["phone"]
     new_username = data.get("username")
 
-    if not phone or not new_username:
-        return jsonify({"error": "Missing phone_number or username"}), 400
+    if not new_username:
+        return jsonify({"error": "Missing username"}), 400
+    if data.get("phone_number") not in (None, phone):
+        return jsonify({"error": "Token does not match phone_number"}), 403
 
     try:
-        users = load_users()
-        if phone in users:
-            users[phone]["username"] = new_username
-            save_users(users)
-            
-            # Generate new token with updated username
-            token = jwt.encode({
-                'user_id': phone,
-                'phone': phone,
-                'username': new_username,
-                'exp': datetime.datetime.utcnow() + datetime.timedelta(days=30)
-            }, jwt_secret, algorithm='HS256')
-            
+        if users.update_username(phone, new_username):
+            # Generate new token with updated username; the old one
+            # carries the stale name, so retire it.
+            token = verifier.issue(phone, new_username)
+            verifier.revoke(g.token)
+
             return jsonify({
                 "success": True,
                 "token": token,
+                "user_id": phone,
                 "user_name": new_username
             }), 200
         else:
             return jsonify({"error": "User not found"}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+@otp.route("/auth/logout", methods=["POST"])
+@require_auth
+def logout():
+    verifier.revoke(g.token)
+    return jsonify({"success": True}), 200
@@ -0,0 +1,91 @@
+from flask import Blueprint, jsonify, request
+from services import metrics
+from services.data_loader import get_data_loader
+from services.meal_planner import MACROS, MAX_REPEATS, PORTION_STEP, PlanError
+import math
+
+plan_bp = Blueprint("plan", __name__)
+data_loader = get_data_loader()
+
+MAX_DAYS = 14
+MAX_MEALS_PER_DAY = 6
+# Candidate portions grow with this, and with them time and memory per plan
+MAX_SERVINGS = 4
+
+def _totals(values):
+    return {m: round(float(v), 1) for m, v in zip(MACROS, values)}
+
+@plan_bp.route("/plan", methods=["POST"])
+def create_plan():
+    """Build a meal plan that hits macro targets.
+
+    Body::
+
+        {"targets": {"calories": 2000, "protein": 150, "carbs": 200, "fat": 60},
+         "period": "day" | "week", "days": 7, "meals_per_day": 3,
+         "diet_plans": ["High-Protein"], "exclude_tags": ["Spicy"],
+         "max_servings": 2, "max_repeats": 3}
+
+    Weekly targets are spread evenly over 7 days. Each meal is a recipe and
+    a number of servings (in half-serving steps up to ``max_servings``, at
+    most ``MAX_SERVINGS``).
+    """
+    data = request.get_json(silent=True) or {}
+    targets = data.get("targets")
+    if not isinstance(targets, dict) or not targets:
+        return jsonify({"error": "No targets provided"}), 400
+    unknown = [name for name in targets if name not in MACROS]
+    if unknown:
+        return jsonify({"error": f"Unknown targets: {', '.join(unknown)}"}), 400
+
+    period = data.get("period", "day")
+    if period not in ("day", "week"):
+        return jsonify({"error": "period must be 'day' or 'week'"}), 400
+    try:
+        per_day = {m: float(v) / (7 if period == "week" else 1) for m, v in targets.items()}
+        days = int(data.get("days", 7 if period == "week" else 1))
+        meals_per_day = int(data.get("meals_per_day", 3))
+        max_servings = float(data.get("max_servings", 2))
+        max_repeats = int(data.get("max_repeats", MAX_REPEATS))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid plan parameters"}), 400
+    if not all(math.isfinite(v) for v in per_day.values()):
+        return jsonify({"error": "Invalid plan parameters"}), 400
+    if not (math.isfinite(max_servings) and PORTION_STEP <= max_servings <= MAX_SERVINGS):
+        return jsonify({"error": f"max_servings must be {PORTION_STEP}-{MAX_SERVINGS}"}), 400
+    if not 1 <= days <= MAX_DAYS or not 1 <= meals_per_day <= MAX_MEALS_PER_DAY or max_repeats < 1:
+        return jsonify({"error": f"days must be 1-{MAX_DAYS}, meals_per_day 1-{MAX_MEALS_PER_DAY}"}), 400
+
+    catalog = data_loader.catalog
+    planner = catalog.meal_planner
+    try:
+        with metrics.timed(metrics.lookup_seconds, operation="plan"):
+            plan, deviation = planner.plan(
+                per_day, days, meals_per_day,
+                diet_plans=data.get("diet_plans") or (),
+                exclude_tags=data.get("exclude_tags") or (),
+                max_servings=max_servings,
+                max_repeats=max_repeats,
+            )
+    except PlanError as e:
+        return jsonify({"error": str(e)}), 400
+
+    result_days = []
+    for day, meals in enumerate(plan, start=1):
+        entries = []
+        for row, servings in meals:
+            recipe_id = planner.recipe_ids[row]
+            entries.append({
+                "recipe_id": recipe_id,
+                "name": catalog.recipe_index.get(recipe_id, {}).get("name"),
+                "servings": servings,
+                **_totals(planner.macros[row] * servings),
+            })
+        day_totals = sum(planner.macros[row] * servings for row, servings in meals)
+        result_days.append({"day": day, "meals": entries, "totals": _totals(day_totals)})
+
+    return jsonify({
+        "targets": {m: round(v, 1) for m, v in per_day.items()},
+        "days": result_days,
+        "deviation": round(deviation, 4),
+    })
@@ -1,17 +1,20 @@
-from flask import Blueprint, jsonify
-from services.data_loader import DataLoader
-import os
+from flask import Blueprint, jsonify, request
+from services import metrics
+from services.data_loader import get_data_loader
+from services.nutrition_index import UnknownNutrient, parse_bounds, parse_page
+from services.response_cache import cached_response
+import numpy as np
 
 recipes_bp = Blueprint("recipes", __name__)
-data_loader = DataLoader()
+data_loader = get_data_loader()
 
 @recipes_bp.route("/recipes", methods=["GET"])
+@cached_response(lambda: data_loader.version)
 def get_recipes():
-    if os.getenv("FLASK_ENV") != "production":
-        print(data_loader.recipes)
     return jsonify(data_loader.recipes)
 
 @recipes_bp.route("/recipe/<string:recipe_id>", methods=["GET"])
+@cached_response(lambda: data_loader.version)
 def get_recipe(recipe_id):
     recipe_details = data_loader.get_recipe_by_id(recipe_id)
     if not recipe_details:
@@ -19,30 +22,39 @@ def get_recipe(recipe_id):
     return jsonify(recipe_details)
 
 @recipes_bp.route("/recipes/filter", methods=["GET"])
+@cached_response(lambda: data_loader.version)
 def filter_recipes():
-    """Filter recipes based on Calories per Gram of Protein."""
+    """Filter recipes based on Calories per Gram of Protein.
 
-    # Build a lookup of nutrients for each recipe
-    nutrition_map = {}
-    for record in data_loader.nutrition_df:
-        rid = record.get("recipe_id")
-        name = record.get("nutrient_name", "").lower()
-        value = float(record.get("value", 0))
-        nutrition_map.setdefault(rid, {})[name] = value
+    Optional ``min_<nutrient>``/``max_<nutrient>`` bounds narrow the set and
+    ``sort``/``limit``/``cursor`` page through it (default sort is
+    ``cal_per_protein`` ascending). The next page's cursor is returned in the
+    ``X-Next-Cursor`` header.
+    """
+    nutrition = data_loader.nutrition
+    sort, descending, limit, cursor = parse_page(request.args, default_sort="cal_per_protein")
+    bounds = parse_bounds(request.args)
+    # Only recipes with a defined ratio are listed, whatever the sort key.
+    bounds.setdefault("cal_per_protein", (-np.inf, None))
+    try:
+        with metrics.timed(metrics.lookup_seconds, operation="nutrition_query"):
+            rows, next_cursor = nutrition.query(bounds, sort, descending, limit, cursor)
+        calories = nutrition.column("calories")[rows].tolist()
+        protein = nutrition.column("protein")[rows].tolist()
+        ratio = nutrition.column("cal_per_protein")[rows].tolist()
+    except UnknownNutrient as e:
+        return jsonify({"error": f"Unknown nutrient: {e}"}), 400
 
-    results = []
-    for rid, nutrients in nutrition_map.items():
-        calories = nutrients.get("calories")
-        protein = nutrients.get("protein")
-        if calories is None or protein in (None, 0):
-            continue
-        cal_per_protein = calories / protein
-        results.append({
+    results = [
+        {
             "recipe_id": rid,
-            "calories": calories,
-            "protein": protein,
-            "cal_per_protein": cal_per_protein,
-        })
-
-    results = sorted(results, key=lambda x: x["cal_per_protein"])
-    return jsonify(results)
+            "calories": cal,
+            "protein": prot,
+            "cal_per_protein": cpp,
+        }
+        for rid, cal, prot, cpp in zip(nutrition.recipe_ids_at(rows), calories, protein, ratio)
+    ]
+    response = jsonify(results)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return response
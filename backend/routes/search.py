@@ -1,35 +1,79 @@
 from flask import Blueprint, jsonify, request
-from services.data_loader import DataLoader
+from services import metrics
+from services.data_loader import get_data_loader
+from services.nutrition_index import UnknownNutrient, parse_bounds, parse_page
+from services.response_cache import cached_response
+import numpy as np
 
 search_bp = Blueprint("search", __name__)
-data_loader = DataLoader()
+data_loader = get_data_loader()
+
+def _text_search(catalog, query, bounds, sort, descending, limit, cursor):
+    """Rank recipes matching ``query`` and apply nutrient bounds to them.
+
+    Results are ordered by relevance unless ``sort`` names a nutrient.
+    Returns ``(records, next_cursor)``.
+    """
+    nutrition = catalog.nutrition
+    for name in bounds:
+        nutrition.column(name)
+
+    with metrics.timed(metrics.lookup_seconds, operation="search"):
+        docs, scores = catalog.search_index.search(query)
+    rows = catalog.search_nutrition_rows[docs]
+    if bounds:
+        keep = rows >= 0
+        keep[keep] = nutrition.mask(bounds, rows[keep])
+        docs, scores, rows = docs[keep], scores[keep], rows[keep]
+
+    if sort is not None:
+        values = np.where(rows >= 0, nutrition.column(sort)[rows], np.nan)
+        order = np.argsort(-values if descending else values, kind="stable")
+        docs, scores, rows = docs[order], scores[order], rows[order]
+
+    total = len(docs)
+    end = total if limit is None else cursor + limit
+    docs, scores, rows = docs[cursor:end], scores[cursor:end], rows[cursor:end]
+
+    has_nutrition = rows >= 0
+    nutrients = iter(nutrition.records(rows[has_nutrition]))
+    index = catalog.search_index
+    records = []
+    for doc, score, has in zip(docs.tolist(), scores.tolist(), has_nutrition.tolist()):
+        record = next(nutrients) if has else {"recipe_id": index.recipe_ids[doc]}
+        record["name"] = index.names[doc]
+        record["score"] = round(score, 4)
+        records.append(record)
+    return records, end if end < total else None
 
 @search_bp.route("/search", methods=["GET"])
+@cached_response(lambda: data_loader.version)
 def search_recipes():
-    """Advanced search filters"""
-    min_protein = request.args.get("min_protein", type=float)
-    max_carbs = request.args.get("max_carbs", type=float)
-
-    # Build nutrient lookup similar to the filter_recipes endpoint
-    nutrition_map = {}
-    for rec in data_loader.nutrition_df:
-        rid = rec.get("recipe_id")
-        name = rec.get("nutrient_name", "").lower()
-        value = float(rec.get("value", 0))
-        nutrition_map.setdefault(rid, {})[name] = value
-
-    filtered_recipes = []
-    for rid, nutrients in nutrition_map.items():
-        protein = nutrients.get("protein")
-        carbs = nutrients.get("carbs")
-
-        if min_protein and (protein is None or protein < min_protein):
-            continue
-        if max_carbs and (carbs is None or carbs > max_carbs):
-            continue
-
-        recipe_data = {"recipe_id": rid}
-        recipe_data.update(nutrients)
-        filtered_recipes.append(recipe_data)
-
-    return jsonify(filtered_recipes)
+    """Advanced search filters.
+
+    ``q`` matches recipe names, ingredient names and tags (prefix and
+    one-typo tolerant, BM25-ranked). Accepts ``min_<nutrient>``/
+    ``max_<nutrient>`` bounds for any nutrient in the library, e.g.
+    ``min_protein=30&max_carbs=40``, plus optional ``sort``/``limit``/
+    ``cursor`` paging. The next page's cursor is returned in the
+    ``X-Next-Cursor`` header.
+    """
+    catalog = data_loader.catalog
+    nutrition = catalog.nutrition
+    query = request.args.get("q", "").strip()
+    bounds = parse_bounds(request.args)
+    sort, descending, limit, cursor = parse_page(request.args)
+    try:
+        if query:
+            results, next_cursor = _text_search(catalog, query, bounds, sort, descending, limit, cursor)
+        else:
+            with metrics.timed(metrics.lookup_seconds, operation="nutrition_query"):
+                rows, next_cursor = nutrition.query(bounds, sort, descending, limit, cursor)
+            results = nutrition.records(rows)
+    except UnknownNutrient as e:
+        return jsonify({"error": f"Unknown nutrient: {e}"}), 400
+
+    response = jsonify(results)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return response
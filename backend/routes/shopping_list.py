@@ -0,0 +1,51 @@
+from flask import Blueprint, jsonify, request
+from services.data_loader import get_data_loader
+from services.instacart_service import InstacartService
+from services.shopping_list import UnknownRecipe, merge_ingredients
+import logging
+
+shopping_list_bp = Blueprint("shopping_list", __name__)
+data_loader = get_data_loader()
+
+def _selections(data):
+    """Recipes to shop for, from ``recipes`` or the ``days`` of a /plan response."""
+    if isinstance(data.get("days"), list):
+        return [meal for day in data["days"] if isinstance(day, dict) for meal in day.get("meals", [])]
+    return data.get("recipes")
+
+@shopping_list_bp.route("/shopping-list", methods=["POST"])
+def build_shopping_list():
+    """Merge the ingredients of several recipes into one list.
+
+    Body: ``{"recipes": [{"recipe_id": 1, "servings": 4}, ...], "instacart": false}``,
+    or a /plan response (its ``days``) to shop for a whole plan. Repeated
+    recipes are summed. With ``"instacart": true`` the list is also sent to
+    Instacart and the link returned as ``shopping_list_url``.
+    """
+    data = request.get_json(silent=True) or {}
+    return shopping_list_response(_selections(data), send_to_instacart=bool(data.get("instacart")))
+
+def shopping_list_response(selections, send_to_instacart):
+    """Validate ``selections``, merge their ingredients and optionally send
+    them to Instacart; shared with the Instacart batch route."""
+    if not isinstance(selections, list) or not selections or not all(isinstance(s, dict) for s in selections):
+        return jsonify({"error": "No recipes provided"}), 400
+
+    try:
+        ingredients = merge_ingredients(data_loader.catalog, selections)
+    except UnknownRecipe as e:
+        return jsonify({"error": "Recipe not found", "recipe_ids": e.args[0]}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if not ingredients:
+        return jsonify({"error": "No ingredients found for these recipes"}), 400
+
+    result = {"ingredients": ingredients}
+    if send_to_instacart:
+        shopping_list_url = InstacartService.get_shopping_list(ingredients)
+        if not shopping_list_url:
+            logging.error("Failed to generate shopping list URL.")
+            return jsonify({"error": "Failed to generate shopping list. Please check your API key and permissions."}), 403
+        result["shopping_list_url"] = shopping_list_url
+    return jsonify(result)
@@ -0,0 +1,130 @@
+from flask import g, jsonify, request
+from functools import wraps
+from config import Config
+from services.cache import TTLCache
+from services.user_store import get_user_store
+import datetime
+import jwt
+import threading
+import time
+import uuid
+
+"""HS256 session tokens: minting, verification and the route decorator."""
+
+TOKEN_LIFETIME = datetime.timedelta(days=30)
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def _token_id(token, claims):
+    # Tokens minted before jti was added are identified by their signature.
+    return claims.get("jti") or token.rsplit(".", 1)[-1]
+
+
+class TokenVerifier:
+    """Verify tokens, remembering recent ones until they expire.
+
+    Entries are keyed by the whole token (not just its signature segment),
+    so a cached signature can never vouch for a different payload.
+    Revocations are kept in the user store, so they hold in every worker and
+    across restarts, and each verified token is checked against it; the
+    ``revoked`` map only spares the lookup for tokens this process already
+    knows are revoked.
+    """
+
+    def __init__(self, secret, cache_size, store=None):
+        self.secret = secret
+        self.cache = TTLCache(cache_size, 0)
+        self._store = store
+        # token id -> exp
+        self.revoked = {}
+        self.revoked_lock = threading.Lock()
+
+    @property
+    def store(self):
+        # Resolved on first use so importing this module opens no database.
+        if self._store is None:
+            self._store = get_user_store()
+        return self._store
+
+    def issue(self, phone, username):
+        return jwt.encode({
+            'user_id': phone,
+            'phone': phone,
+            'username': username,
+            'exp': datetime.datetime.utcnow() + TOKEN_LIFETIME,
+            # Unique per token, so revoking one never revokes a twin minted
+            # in the same second.
+            'jti': uuid.uuid4().hex
+        }, self.secret, algorithm='HS256')
+
+    def _claims(self, token):
+        claims = self.cache.get(token)
+        if claims is not None:
+            return claims
+        try:
+            claims = jwt.decode(token, self.secret, algorithms=["HS256"], options={"require": ["exp"]})
+        except jwt.ExpiredSignatureError:
+            raise InvalidToken("Token has expired")
+        except jwt.InvalidTokenError:
+            raise InvalidToken("Invalid token")
+        # TTLCache expiry doubles as the exp check for later hits.
+        self.cache.put(token, claims, ttl=claims["exp"] - time.time())
+        return claims
+
+    def verify(self, token):
+        """Return the token's claims or raise ``InvalidToken``."""
+        claims = self._claims(token)
+        token_id = _token_id(token, claims)
+        if token_id in self.revoked:
+            raise InvalidToken("Token has been revoked")
+        if self.store.is_token_revoked(token_id):
+            self._remember(token_id, claims["exp"])
+            raise InvalidToken("Token has been revoked")
+        return claims
+
+    def revoke(self, token):
+        """Revoke a token that has already passed ``verify``."""
+        claims = self._claims(token)
+        token_id = _token_id(token, claims)
+        self.store.revoke_token(token_id, claims["exp"])
+        self._remember(token_id, claims["exp"])
+        self.cache.discard(token)
+
+    def _remember(self, token_id, expires_at):
+        now = time.time()
+        with self.revoked_lock:
+            self.revoked[token_id] = expires_at
+            # Past exp they are rejected anyway, so drop them.
+            for expired in [t for t, exp in self.revoked.items() if exp < now]:
+                del self.revoked[expired]
+
+
+verifier = TokenVerifier(Config.JWT_SECRET, Config.AUTH_CACHE_SIZE)
+
+
+def bearer_token():
+    header = request.headers.get("Authorization", "")
+    scheme, _, token = header.partition(" ")
+    return token.strip() if scheme.lower() == "bearer" else None
+
+
+def require_auth(view):
+    """Reject requests without a valid ``Authorization: Bearer`` token.
+
+    The verified claims are available to the view as ``g.user``.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = bearer_token()
+        if not token:
+            return jsonify({"error": "Missing bearer token"}), 401
+        try:
+            g.user = verifier.verify(token)
+        except InvalidToken as e:
+            return jsonify({"error": str(e)}), 401
+        g.token = token
+        return view(*args, **kwargs)
+    return wrapper
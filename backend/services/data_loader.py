@@ -1,99 +1,289 @@
 from supabase import create_client, Client
+from postgrest.exceptions import APIError
+from concurrent.futures import ThreadPoolExecutor
 from config import Config
-import os
+from services.meal_planner import MealPlanner
+from services.nutrition_index import NutritionMatrix
+from services.prompt_context import build_contexts
+from services.search_index import SearchIndex
+from services import metrics, snapshot
+import logging
+import threading
+import numpy as np
 
 """Utility for loading and transforming Supabase data."""
 
-supabase: Client = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+supabase: Client = None
 
+# DataLoader attribute name -> (Supabase table name, primary key columns,
+# projected columns). ``None`` pulls every column; projections only list
+# what the routes read, plus the watermark column (see ``_columns``) so that
+# incremental refreshes pick up edits.
+TABLES = {
+    "recipes": ("recipes", ("recipe_id",), None),
+    "ingredients_library": ("ingredients_library", ("ingredient_id",), ("ingredient_id", "name")),
+    "recipe_ingredients": ("recipe_ingredients_join_table", ("recipe_id", "ingredient_id"), None),
+    "nutrient_library": ("nutrient_library", ("nutrient_id",), ("nutrient_id", "name", "unit")),
+    "recipe_nutrition": ("recipe_nutrition_join_table", ("recipe_id", "nutrient_id"), ("recipe_id", "nutrient_id", "value")),
+    "diet_plans": ("diet_plans", ("diet_plan_id",), ("diet_plan_id", "name")),
+    "recipe_diet_plan": ("recipe_diet_plan_join_table", ("recipe_id", "diet_plan_id"), ("recipe_id", "diet_plan_id")),
+    "tags_library": ("tags_library", ("tag_id",), ("tag_id", "tag_name")),
+    "recipe_tags": ("recipe_tags_join_table", ("recipe_id", "tag_id"), ("recipe_id", "tag_id")),
+    "instructions": ("instructions", ("instruction_id",), None),
+    "meal_prep_tips": ("meal_prep_tips", ("tip_id",), None),
+}
 
-class DataLoader:
-    def __init__(self):
-        """Load Supabase tables into memory"""
-        self.recipes = self._fetch("recipes")
-        self.ingredients_library = self._fetch("ingredients_library")
-        self.recipe_ingredients = self._fetch("recipe_ingredients_join_table")
-
-        self.nutrient_library = self._fetch("nutrient_library")
-        self.recipe_nutrition = self._fetch("recipe_nutrition_join_table")
-
-        self.diet_plans = self._fetch("diet_plans")
-        self.recipe_diet_plan = self._fetch("recipe_diet_plan_join_table")
-
-        self.tags_library = self._fetch("tags_library")
-        self.recipe_tags = self._fetch("recipe_tags_join_table")
-
-        self.instructions = self._fetch("instructions")
-        self.meal_prep_tips = self._fetch("meal_prep_tips")
-
-        # Build a simple list of nutrition records with names resolved. This
-        # mirrors the pandas DataFrame used previously but avoids the pandas
-        # dependency at runtime.
-        self.nutrition_df = self._build_nutrition_records()
-
-    def _fetch(self, table):
-        result = supabase.table(table).select("*").execute()
-        if os.getenv("FLASK_ENV") != "production":
-            print(f"Fetched from {table}: {result.data}")
-        return result.data
-
-    def _build_nutrition_records(self):
-        """Return nutrition records with nutrient names resolved."""
-        nutrient_map = {n["nutrient_id"]: n["name"] for n in self.nutrient_library}
-        records = []
-        for entry in self.recipe_nutrition:
-            records.append({
-                "recipe_id": entry.get("recipe_id"),
-                "nutrient_name": nutrient_map.get(entry.get("nutrient_id"), "Unknown"),
-                "value": entry.get("value", 0.0)
-            })
-        return records
+# Join tables that hang off a recipe. Each one is indexed by ``recipe_id`` so
+# assembling a recipe touches only that recipe's rows.
+RECIPE_TABLES = (
+    "recipe_ingredients",
+    "recipe_nutrition",
+    "recipe_diet_plan",
+    "recipe_tags",
+    "instructions",
+    "meal_prep_tips",
+)
+
+
+_client_lock = threading.Lock()
+
+
+def _client():
+    """Create the Supabase client on first use so DataLoader can be built offline."""
+    global supabase
+    if supabase is None:
+        # The fetch pool calls this from several threads at once.
+        with _client_lock:
+            if supabase is None:
+                supabase = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+    return supabase
+
+
+_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_data_loader():
+    """Return the process-wide DataLoader shared by every blueprint."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = DataLoader(lazy=Config.DATA_LOADER_LAZY)
+                _instance.start_refresher(Config.CATALOG_REFRESH_INTERVAL)
+    return _instance
+
+
+def _ingest(name, rows):
+    """Consume ``rows`` once, returning the table list and its hash index.
+
+    Recipe join tables are grouped by ``recipe_id``; every other table is
+    keyed by its primary key.
+    """
+    table = []
+    index = {}
+    if name in RECIPE_TABLES:
+        for row in rows:
+            table.append(row)
+            index.setdefault(row.get("recipe_id"), []).append(row)
+    else:
+        key = TABLES[name][1][0]
+        for row in rows:
+            table.append(row)
+            index[row[key]] = row
+    return table, index
+
+
+# Tables found to have no watermark column; their projections leave it out.
+_unwatermarked = set()
+
+
+def _columns(name):
+    """The select list for a table: its projection plus the watermark column."""
+    columns = TABLES[name][2]
+    if columns is None:
+        return "*"
+    column = Config.CATALOG_WATERMARK_COLUMN
+    if name not in _unwatermarked and column not in columns:
+        columns = columns + (column,)
+    return ",".join(columns)
+
+
+def _row_key(name):
+    columns = TABLES[name][1]
+    return lambda row: tuple(row.get(c) for c in columns)
+
+
+def _watermark(name, rows):
+    """Pick the column used to detect new/changed rows of a table.
+
+    ``updated_at`` catches edits as well as inserts. Tables without it fall
+    back to a single-column id, which only catches inserts. Composite-key
+    join tables without ``updated_at`` have no watermark; they are refreshed
+    by recipe instead (see ``DataLoader.refresh``).
+    """
+    column = Config.CATALOG_WATERMARK_COLUMN
+    values = [r[column] for r in rows if r.get(column) is not None]
+    if values:
+        return column, max(values)
+    keys = TABLES[name][1]
+    if len(keys) == 1:
+        return keys[0], max((r[keys[0]] for r in rows if r.get(keys[0]) is not None), default=0)
+    return None
+
+
+class Catalog:
+    """One immutable snapshot of the catalog tables and their indexes.
+
+    Readers hold a reference to a single Catalog for the duration of a
+    request; refreshes build a new one and swap it in.
+    """
+
+    def __init__(self, tables, version=1, base=None, changed=()):
+        """Build a snapshot from ``tables``.
+
+        Each value is either an iterable of rows or a ``(rows, index)`` pair
+        already produced by ``_ingest`` while the table was being fetched.
+        """
+        self.version = version
+        self.indexes = {}
+        for name in TABLES:
+            data = tables.get(name, [])
+            rows, index = data if isinstance(data, tuple) else _ingest(name, data)
+            setattr(self, name, rows)
+            self.indexes[name] = index
+        self._build_indexes(base, set(changed))
+
+    def _build_indexes(self, base, changed):
+        """Build lookup maps once so per-request lookups are constant time.
+
+        When ``base`` is given only maps over ``changed`` tables are
+        rebuilt; the rest are shared with the previous snapshot.
+        """
+        def stale(*names):
+            return base is None or any(n in changed for n in names)
+
+        self.recipe_index = self.indexes["recipes"]
+
+        self.ingredient_map = (
+            {i: row["name"] for i, row in self.indexes["ingredients_library"].items()}
+            if stale("ingredients_library") else base.ingredient_map
+        )
+        self.nutrient_map = (
+            {i: {"name": row["name"], "unit": row["unit"]} for i, row in self.indexes["nutrient_library"].items()}
+            if stale("nutrient_library") else base.nutrient_map
+        )
+        self.diet_plan_map = (
+            {i: row["name"] for i, row in self.indexes["diet_plans"].items()}
+            if stale("diet_plans") else base.diet_plan_map
+        )
+        self.tag_map = (
+            {i: row["tag_name"] for i, row in self.indexes["tags_library"].items()}
+            if stale("tags_library") else base.tag_map
+        )
+
+        self.recipe_rows = {name: self.indexes[name] for name in RECIPE_TABLES}
+
+        # Dense recipe x nutrient matrix backing the vectorized filters.
+        self.nutrition = (
+            NutritionMatrix(self.recipe_rows["recipe_nutrition"], self.nutrient_map)
+            if stale("recipe_nutrition", "nutrient_library") else base.nutrition
+        )
+
+        # Full-text index over names, ingredients and tags, plus each search
+        # document's row in the nutrition matrix (-1 when it has none).
+        search_sources = ("recipes", "recipe_ingredients", "ingredients_library", "recipe_tags", "tags_library")
+        self.search_index = (
+            SearchIndex(
+                self.recipes, self.recipe_rows["recipe_ingredients"], self.ingredient_map,
+                self.recipe_rows["recipe_tags"], self.tag_map,
+            )
+            if stale(*search_sources) else base.search_index
+        )
+        self.search_nutrition_rows = (
+            np.array([self.nutrition.rows.get(rid, -1) for rid in self.search_index.recipe_ids], dtype=np.int64)
+            if stale("recipe_nutrition", "nutrient_library", *search_sources) else base.search_nutrition_rows
+        )
+
+        # Macro matrix and diet/tag membership for the meal planner.
+        self.meal_planner = (
+            MealPlanner(
+                self.nutrition, self.recipe_rows["recipe_diet_plan"], self.diet_plan_map,
+                self.recipe_rows["recipe_tags"], self.tag_map,
+            )
+            if stale("recipe_nutrition", "nutrient_library", "recipe_diet_plan", "diet_plans", "recipe_tags", "tags_library")
+            else base.meal_planner
+        )
+
+        # Chat prompt context per recipe, so chat never assembles a recipe.
+        self.prompt_contexts = (
+            build_contexts(self)
+            if stale("recipes", "recipe_ingredients", "ingredients_library", "recipe_nutrition", "nutrient_library")
+            else base.prompt_contexts
+        )
+
+    def apply(self, upserts, replaced):
+        """Return a new Catalog with changes merged in; ``self`` is untouched.
+
+        ``upserts`` maps table names to changed rows, merged by primary key.
+        ``replaced`` maps recipe join tables to ``(recipe_ids, rows)``: every
+        existing row of those recipes is dropped in favour of ``rows``.
+        """
+        tables = {name: (getattr(self, name), self.indexes[name]) for name in TABLES}
+        for name, rows in upserts.items():
+            key = _row_key(name)
+            merged = {key(r): r for r in getattr(self, name)}
+            merged.update((key(r), r) for r in rows)
+            tables[name] = list(merged.values())
+        for name, (recipe_ids, rows) in replaced.items():
+            kept = [r for r in getattr(self, name) if r.get("recipe_id") not in recipe_ids]
+            tables[name] = kept + rows
+        return Catalog(tables, self.version + 1, base=self, changed=set(upserts) | set(replaced))
+
+    def _rows_for(self, table, recipe_id):
+        return self.recipe_rows[table].get(recipe_id, [])
 
+    @metrics.timed(metrics.lookup_seconds, operation="get_recipe")
     def get_recipe_by_id(self, recipe_id: str):
         """Return full recipe data using normalized structure"""
-        recipe_id = int(recipe_id)
-        recipe = next((r for r in self.recipes if r["recipe_id"] == recipe_id), None)
+        try:
+            recipe_id = int(recipe_id)
+        except (TypeError, ValueError):
+            return None
+        recipe = self.recipe_index.get(recipe_id)
         if not recipe:
             return None
 
         # Resolve ingredients
-        ingredient_map = {i["ingredient_id"]: i["name"] for i in self.ingredients_library}
         ingredients = [
             {
                 **entry,
-                "name": ingredient_map.get(entry["ingredient_id"], "Unknown")
+                "name": self.ingredient_map.get(entry["ingredient_id"], "Unknown")
             }
-            for entry in self.recipe_ingredients
-            if entry["recipe_id"] == recipe_id
+            for entry in self._rows_for("recipe_ingredients", recipe_id)
         ]
 
         # Resolve nutrition
-        nutrient_map = {n["nutrient_id"]: {"name": n["name"], "unit": n["unit"]} for n in self.nutrient_library}
-        nutrition = [
-            {
+        nutrition = []
+        for entry in self._rows_for("recipe_nutrition", recipe_id):
+            nutrient = self.nutrient_map.get(entry["nutrient_id"], {})
+            nutrition.append({
                 **entry,
-                "name": nutrient_map.get(entry["nutrient_id"], {}).get("name", "Unknown"),  # Ensure name is resolved
-                "unit": nutrient_map.get(entry["nutrient_id"], {}).get("unit", ""),
+                "name": nutrient.get("name", "Unknown"),  # Ensure name is resolved
+                "unit": nutrient.get("unit", ""),
                 "value": entry.get("value", 0.0)  # Ensure value is not missing
-            }
-            for entry in self.recipe_nutrition
-            if entry["recipe_id"] == recipe_id
-        ]
+            })
 
         # Resolve diet plans
-        diet_plan_map = {d["diet_plan_id"]: d["name"] for d in self.diet_plans}
         diet_plans = [
-            {"diet_plan_id": entry["diet_plan_id"], "name": diet_plan_map.get(entry["diet_plan_id"])}
-            for entry in self.recipe_diet_plan
-            if entry["recipe_id"] == recipe_id
+            {"diet_plan_id": entry["diet_plan_id"], "name": self.diet_plan_map.get(entry["diet_plan_id"])}
+            for entry in self._rows_for("recipe_diet_plan", recipe_id)
         ]
 
         # Resolve tags
-        tag_map = {t["tag_id"]: t["tag_name"] for t in self.tags_library}  # Ensure tag_name is used
         tags = [
-            {"tag_id": entry["tag_id"], "tag_name": tag_map.get(entry["tag_id"], "Unknown")}  # Use tag_name
-            for entry in self.recipe_tags
-            if entry["recipe_id"] == recipe_id
+            {"tag_id": entry["tag_id"], "tag_name": self.tag_map.get(entry["tag_id"], "Unknown")}  # Use tag_name
+            for entry in self._rows_for("recipe_tags", recipe_id)
         ]
 
         return {
@@ -102,6 +292,201 @@ class DataLoader:
             "nutrition": nutrition,
             "diet_plans": diet_plans,
             "tags": tags,
-            "instructions": [i for i in self.instructions if i["recipe_id"] == recipe_id],
-            "meal_prep_tips": [m for m in self.meal_prep_tips if m["recipe_id"] == recipe_id]
+            "instructions": list(self._rows_for("instructions", recipe_id)),
+            "meal_prep_tips": list(self._rows_for("meal_prep_tips", recipe_id))
         }
+
+
+class DataLoader:
+    def __init__(self, tables=None, lazy=False):
+        """Load Supabase tables into memory.
+
+        ``tables`` may map attribute names to row lists to build the loader
+        from data already in hand (fixtures, benchmarks) instead of Supabase.
+        With ``lazy`` the tables are only fetched on first access.
+        """
+        self._tables = tables
+        self._catalog = None
+        self._watermarks = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._refresher = None
+        if not lazy:
+            self.load()
+
+    def __getattr__(self, name):
+        # Tables, indexes and lookups live on the current Catalog snapshot.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.catalog, name)
+
+    @property
+    def catalog(self):
+        """The current snapshot, loading it first if the loader is lazy."""
+        catalog = self._catalog
+        if catalog is None:
+            self.load()
+            catalog = self._catalog
+        return catalog
+
+    @property
+    def version(self):
+        return self.catalog.version
+
+    def load(self):
+        """Fetch every table and build the lookup indexes, once.
+
+        Starts from the snapshot at ``CATALOG_SNAPSHOT_PATH`` when there is
+        one, falling back to Supabase if it cannot be read.
+        """
+        with self._lock:
+            if self._catalog is None:
+                catalog = self._read_snapshot() if self._tables is None else None
+                if catalog is not None:
+                    self._install(catalog)
+                else:
+                    self._reload()
+
+    def reload(self):
+        """Re-fetch every table and swap in a fresh snapshot."""
+        with self._lock:
+            self._reload()
+        return self._catalog.version
+
+    @metrics.timed(metrics.catalog_seconds, kind="full")
+    def _reload(self):
+        tables = self._tables if self._tables is not None else self._fetch_all()
+        self._tables = None
+        version = self._catalog.version + 1 if self._catalog else 1
+        self._install(Catalog(tables, version))
+
+    def _install(self, catalog):
+        self._watermarks = {name: _watermark(name, getattr(catalog, name)) for name in TABLES}
+        self._catalog = catalog
+
+    def _read_snapshot(self):
+        path = Config.CATALOG_SNAPSHOT_PATH
+        if not snapshot.exists(path):
+            return None
+        try:
+            with metrics.timed(metrics.catalog_seconds, kind="snapshot"):
+                catalog = snapshot.read(path)
+        except snapshot.SnapshotError as e:
+            logging.error(f"{e}; loading from Supabase instead")
+            return None
+        logging.info(f"Loaded catalog snapshot v{catalog.version} from {path}")
+        return catalog
+
+    def write_snapshot(self, path=None, source="supabase"):
+        """Save the current catalog so later starts can skip Supabase."""
+        snapshot.write(self.catalog, path or Config.CATALOG_SNAPSHOT_PATH, source)
+
+    @metrics.timed(metrics.catalog_seconds, kind="refresh")
+    def refresh(self):
+        """Pull rows changed since the last sync and swap in a patched snapshot.
+
+        Returns True when anything changed. Deleted rows are only dropped by
+        a full ``reload``.
+        """
+        with self._lock:
+            catalog = self._catalog
+            if catalog is None:
+                return False
+
+            tracked = {name: mark for name, mark in self._watermarks.items() if mark}
+            with ThreadPoolExecutor(max_workers=Config.DATA_LOADER_WORKERS) as pool:
+                futures = {
+                    name: pool.submit(self._fetch, name, since=mark)
+                    for name, mark in tracked.items()
+                }
+                upserts = {name: f.result() for name, f in futures.items() if f.result()}
+
+                # A new or edited recipe usually arrives with its join rows;
+                # re-pull those wholesale for tables we cannot diff.
+                recipe_ids = {r["recipe_id"] for r in upserts.get("recipes", [])}
+                untracked = [name for name in RECIPE_TABLES if name not in tracked]
+                futures = {
+                    name: pool.submit(self._fetch, name, recipe_ids=recipe_ids)
+                    for name in (untracked if recipe_ids else [])
+                }
+                replaced = {name: (recipe_ids, f.result()) for name, f in futures.items()}
+
+            if not upserts and not replaced:
+                return False
+
+            for name, rows in upserts.items():
+                column, mark = tracked[name]
+                self._watermarks[name] = (column, max([mark] + [r[column] for r in rows if r.get(column) is not None]))
+
+            self._catalog = catalog.apply(upserts, replaced)
+            logging.info(
+                f"Catalog refreshed to version {self._catalog.version}: "
+                f"{ {name: len(rows) for name, rows in upserts.items()} }"
+            )
+            return True
+
+    def start_refresher(self, interval):
+        """Refresh the catalog every ``interval`` seconds on a daemon thread."""
+        if interval <= 0 or self._refresher is not None:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logging.error(f"Catalog refresh failed: {e}")
+
+        self._refresher = threading.Thread(target=run, name="catalog-refresher", daemon=True)
+        self._refresher.start()
+
+    def stop_refresher(self):
+        self._stop.set()
+
+    def _fetch_all(self):
+        """Fetch all tables concurrently; each one is an independent round-trip.
+
+        Pages are indexed as they arrive, so each table is walked once.
+        """
+        def load(name):
+            return _ingest(name, self._iter_rows(name))
+
+        with ThreadPoolExecutor(max_workers=Config.DATA_LOADER_WORKERS) as pool:
+            return dict(zip(TABLES, pool.map(load, TABLES)))
+
+    def _fetch(self, name, since=None, recipe_ids=None):
+        return list(self._iter_rows(name, since=since, recipe_ids=recipe_ids))
+
+    def _iter_rows(self, name, since=None, recipe_ids=None):
+        """Yield the rows of a table page by page with range requests.
+
+        PostgREST silently truncates unpaged selects at its ``max-rows``
+        limit, so tables are read in ``SUPABASE_PAGE_SIZE`` ranges (which
+        must not exceed ``max-rows``) until a short page marks the end.
+        """
+        table, keys, _ = TABLES[name]
+        page_size = Config.SUPABASE_PAGE_SIZE
+        offset = 0
+        while True:
+            query = _client().table(table).select(_columns(name))
+            if since is not None:
+                column, value = since
+                query = query.gt(column, value)
+            if recipe_ids is not None:
+                query = query.in_("recipe_id", sorted(recipe_ids))
+            for key in keys:
+                query = query.order(key)
+            try:
+                rows = query.range(offset, offset + page_size - 1).execute().data
+            except APIError as e:
+                # 42703: undefined column, i.e. no watermark column on this table
+                if e.code != "42703" or name in _unwatermarked or TABLES[name][2] is None:
+                    raise
+                logging.info(f"{table} has no {Config.CATALOG_WATERMARK_COLUMN} column; refreshing it by id")
+                _unwatermarked.add(name)
+                continue
+            yield from rows
+            offset += len(rows)
+            if len(rows) < page_size:
+                break
+        logging.debug(f"Fetched {offset} rows from {table}")
@@ -1,38 +1,76 @@
 import requests
 import logging
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from config import Config
+from services import metrics
+
+
+def _session():
+    """Shared session so calls reuse pooled keep-alive connections.
+
+    Retries back off exponentially and only cover connection errors and
+    throttling/5xx responses. POST is retried on purpose: a shopping list
+    request has no side effect beyond returning a link.
+    """
+    retry = Retry(
+        total=Config.INSTACART_MAX_RETRIES,
+        backoff_factor=Config.INSTACART_BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["POST"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=Config.INSTACART_POOL_SIZE,
+        pool_maxsize=Config.INSTACART_POOL_SIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Content-Type": "application/json"})
+    return session
+
+
+_http = _session()
+
 
 class InstacartService:
-    BASE_URL = "https://api.instacart.com/v2"
+    BASE_URL = Config.INSTACART_BASE_URL
 
     @staticmethod
     def get_shopping_list(recipe_ingredients):
         """
         Generate a shopping list link for the given recipe ingredients.
+
+        Ingredients carrying a ``unit`` (as merged by the batch endpoint)
+        pass it through to Instacart.
         """
         try:
             if not Config.INSTACART_API_KEY or Config.INSTACART_API_KEY == "your-default-api-key":
                 logging.error("Instacart API key not configured")
                 return None
 
-            headers = {
-                "Authorization": f"Bearer {Config.INSTACART_API_KEY}",
-                "Content-Type": "application/json"
-            }
-            payload = {
-                "items": [
-                    {"name": ingredient.get("name", ""), "quantity": ingredient.get("amount", 1)}
-                    for ingredient in recipe_ingredients
-                ]
-            }
-            logging.info(f"Sending request to Instacart API with payload: {payload}")
-
-            response = requests.post(
-                f"{InstacartService.BASE_URL}/shopping_list",
-                json=payload,
-                headers=headers
-            )
-            logging.info(f"Instacart API response: {response.status_code}, {response.text}")
+            headers = {"Authorization": f"Bearer {Config.INSTACART_API_KEY}"}
+            items = []
+            for ingredient in recipe_ingredients:
+                item = {"name": ingredient.get("name", ""), "quantity": ingredient.get("amount", 1)}
+                if ingredient.get("unit"):
+                    item["unit"] = ingredient["unit"]
+                items.append(item)
+            payload = {"items": items}
+            logging.info(f"Sending {len(items)} items to Instacart API")
+            logging.debug(f"Instacart API payload: {payload}")
+
+            with metrics.timed(metrics.upstream_seconds, service="instacart", operation="shopping_list"):
+                response = _http.post(
+                    f"{InstacartService.BASE_URL}/shopping_list",
+                    json=payload,
+                    headers=headers,
+                    timeout=(Config.INSTACART_CONNECT_TIMEOUT, Config.INSTACART_TIMEOUT)
+                )
+            logging.info(f"Instacart API response: {response.status_code}")
+            logging.debug(f"Instacart API response body: {response.text}")
 
             if response.status_code == 401:
                 logging.error("Invalid Instacart API key")
@@ -40,13 +78,13 @@ class InstacartService:
             elif response.status_code == 403:
                 logging.error("Access denied by Instacart API")
                 return None
-            
+
             response.raise_for_status()
             shopping_list_url = response.json().get("shopping_list_url")
             if not shopping_list_url:
                 logging.error("No shopping list URL in response")
                 return None
-                
+
             return shopping_list_url
         except requests.exceptions.RequestException as e:
             logging.error(f"Request to Instacart API failed: {e}")
@@ -0,0 +1,170 @@
+import numpy as np
+
+"""Pick recipes and portions that hit daily macro targets."""
+
+MACROS = ("calories", "protein", "carbs", "fat")
+
+# Portions a meal may use, in multiples of this many servings
+PORTION_STEP = 0.5
+
+# (recipe, portion) pairs kept after pruning, and partial days kept per meal
+CANDIDATES = 512
+BEAM_WIDTH = 32
+
+# Default times one recipe may appear in a plan (a prepped batch)
+MAX_REPEATS = 3
+
+
+class PlanError(ValueError):
+    pass
+
+
+def _members(rows_by_recipe, key, row_of):
+    """``{id: nutrition rows}`` for a recipe join table such as diet plans."""
+    members = {}
+    for rid, entries in rows_by_recipe.items():
+        row = row_of.get(rid)
+        if row is None:
+            continue
+        for entry in entries:
+            members.setdefault(entry.get(key), []).append(row)
+    return {k: np.array(v, dtype=np.int64) for k, v in members.items()}
+
+
+class MealPlanner:
+    """Beam search over the nutrition matrix for multi-day meal plans.
+
+    Each day is scored by squared relative deviation from the targets, so a
+    10% miss on protein costs the same as a 10% miss on calories.
+    """
+
+    def __init__(self, nutrition, diet_rows, diet_plan_map, tag_rows, tag_map):
+        self.recipe_ids = nutrition.recipe_ids
+        size = len(self.recipe_ids)
+        if all(m in nutrition.values for m in MACROS):
+            self.macros = np.column_stack([nutrition.values[m] for m in MACROS])
+        else:
+            self.macros = np.full((size, len(MACROS)), np.nan)
+        self.valid = np.isfinite(self.macros).all(axis=1) & (self.macros[:, 0] > 0)
+
+        self.diet_members = _members(diet_rows, "diet_plan_id", nutrition.rows)
+        self.tag_members = _members(tag_rows, "tag_id", nutrition.rows)
+        self.diet_ids = {name.lower(): i for i, name in diet_plan_map.items() if name}
+        self.tag_ids = {name.lower(): i for i, name in tag_map.items() if name}
+
+    @staticmethod
+    def _resolve(values, ids, label):
+        """Map ids or names (case-insensitive) to ids."""
+        resolved = []
+        for value in values:
+            if isinstance(value, str) and value.lower() in ids:
+                resolved.append(ids[value.lower()])
+            elif value in ids.values():
+                resolved.append(value)
+            else:
+                raise PlanError(f"Unknown {label}: {value}")
+        return resolved
+
+    def eligible(self, diet_plans=(), exclude_tags=()):
+        """Mask of recipes with full macros, in any of ``diet_plans`` and
+        carrying none of ``exclude_tags``."""
+        mask = self.valid.copy()
+        if diet_plans:
+            allowed = np.zeros(len(mask), dtype=bool)
+            for i in self._resolve(diet_plans, self.diet_ids, "diet plan"):
+                allowed[self.diet_members.get(i, [])] = True
+            mask &= allowed
+        for i in self._resolve(exclude_tags, self.tag_ids, "tag"):
+            mask[self.tag_members.get(i, [])] = False
+        return mask
+
+    def plan(self, targets, days=1, meals_per_day=3, diet_plans=(), exclude_tags=(),
+             max_servings=2, max_repeats=MAX_REPEATS):
+        """Return ``(days, deviation)`` for per-day ``{macro: amount}`` targets.
+
+        ``days`` is a list with one list of ``(row, servings)`` meals per
+        day; ``deviation`` is the summed score over all days. Macros missing
+        from ``targets`` are not scored.
+        """
+        target = np.array([targets.get(m, 0.0) for m in MACROS], dtype=float)
+        weights = np.zeros(len(MACROS))
+        scored = target > 0
+        if not scored.any():
+            raise PlanError(f"Give at least one positive target among {', '.join(MACROS)}")
+        weights[scored] = 1.0 / target[scored] ** 2
+
+        portions = np.arange(1, int(max_servings / PORTION_STEP) + 1) * PORTION_STEP
+        if not len(portions):
+            raise PlanError(f"max_servings must be at least {PORTION_STEP}")
+
+        # Prune to the pairs that best fit an even share of the day, so the
+        # search below works on a few hundred candidates instead of every
+        # recipe in every portion.
+        rows = self.eligible(diet_plans, exclude_tags).nonzero()[0]
+        if len(rows) < meals_per_day:
+            raise PlanError("Not enough recipes match the constraints")
+        values = self.macros[rows][:, None, :] * portions[None, :, None]
+        fit = (((values - target / meals_per_day) ** 2) * weights).sum(axis=2).ravel()
+        keep = min(CANDIDATES, fit.size)
+        best = np.argpartition(fit, keep - 1)[:keep]
+        best = best[np.argsort(fit[best], kind="stable")]
+        candidate_rows = rows[best // len(portions)]
+        candidate_servings = portions[best % len(portions)]
+        candidate_values = values.reshape(-1, len(MACROS))[best]
+
+        uses = {}
+        plan = []
+        deviation = 0.0
+        for _ in range(days):
+            available = np.array([uses.get(r, 0) < max_repeats for r in candidate_rows.tolist()])
+            chosen, score = self._day(candidate_values, candidate_rows, available, target, weights, meals_per_day)
+            deviation += score
+            meals = []
+            for i in chosen:
+                row = int(candidate_rows[i])
+                uses[row] = uses.get(row, 0) + 1
+                meals.append((row, float(candidate_servings[i])))
+            plan.append(meals)
+        return plan, deviation
+
+    @staticmethod
+    def _day(values, rows, available, target, weights, meals):
+        """Beam search for one day; returns ``(candidate indices, score)``.
+
+        Partial days are scored as if the remaining meals hit their share of
+        the target exactly. A recipe appears at most once per day.
+        """
+        share = target / meals
+        sums = np.zeros((1, len(MACROS)))
+        chosen = np.zeros((1, 0), dtype=np.int64)
+        for meal in range(meals):
+            projected = sums[:, None, :] + values[None, :, :] + (meals - meal - 1) * share
+            scores = (((projected - target) ** 2) * weights).sum(axis=2)
+            scores[:, ~available] = np.inf
+            if meal:
+                scores[(rows[chosen][:, :, None] == rows[None, None, :]).any(axis=1)] = np.inf
+
+            flat = scores.ravel()
+            top = min(BEAM_WIDTH * (meal + 1) * 2, flat.size)
+            order = np.argpartition(flat, top - 1)[:top]
+            order = order[np.argsort(flat[order], kind="stable")]
+            # The same set of meals is reachable in any order; keep one.
+            kept, seen = [], set()
+            for i in order.tolist():
+                if not np.isfinite(flat[i]):
+                    break
+                state, candidate = divmod(i, values.shape[0])
+                key = frozenset(chosen[state].tolist() + [candidate])
+                if key not in seen:
+                    seen.add(key)
+                    kept.append((state, candidate, flat[i]))
+                    if len(kept) == BEAM_WIDTH:
+                        break
+            if not kept:
+                raise PlanError("Not enough recipes match the constraints")
+
+            states = np.array([k[0] for k in kept])
+            candidates = np.array([k[1] for k in kept])
+            sums = sums[states] + values[candidates]
+            chosen = np.column_stack([chosen[states], candidates])
+        return chosen[0].tolist(), float(kept[0][2])
@@ -0,0 +1,284 @@
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+from flask.json import JSONEncoder
+from config import Config
+import logging
+import os
+import sys
+import threading
+import time
+import numpy as np
+
+"""Request and upstream timings, cache stats and a slow-request profiler.
+
+Everything is kept per process and rendered in the Prometheus text format by
+``render()`` for the ``/metrics`` route.
+"""
+
+# Seconds; whole requests and upstream calls
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Seconds; in-memory lookups and serialization
+FAST_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+class Histogram:
+    def __init__(self, name, help, buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            series = {key: (list(counts), total, count) for key, (counts, total, count) in self.series.items()}
+        for key, (counts, total, count) in sorted(series.items()):
+            labels = dict(key)
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_labels({**labels, 'le': f'{bound:g}'})} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels({**labels, 'le': '+Inf'})} {count}")
+            lines.append(f"{self.name}_sum{_labels(labels)} {total!r}")
+            lines.append(f"{self.name}_count{_labels(labels)} {count}")
+        return lines
+
+
+class Sampled:
+    """Counter or gauge read from the rest of the app at scrape time.
+
+    ``collect`` returns ``[(labels, value), ...]``.
+    """
+
+    def __init__(self, name, help, kind, collect):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.collect = collect
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            samples = self.collect()
+        except Exception as e:
+            logging.error(f"Collecting metric {self.name} failed: {e}")
+            return lines
+        for labels, value in samples:
+            lines.append(f"{self.name}{_labels(labels)} {value if isinstance(value, int) else repr(float(value))}")
+        return lines
+
+
+request_seconds = Histogram("http_request_duration_seconds", "Time to build each response, by route.")
+upstream_seconds = Histogram("upstream_request_duration_seconds", "Calls to OpenAI, Instacart and Twilio.")
+lookup_seconds = Histogram("catalog_lookup_duration_seconds", "In-memory catalog queries.", FAST_BUCKETS)
+json_seconds = Histogram("json_serialize_duration_seconds", "JSON encoding of response bodies, by route.", FAST_BUCKETS)
+catalog_seconds = Histogram("catalog_load_duration_seconds", "DataLoader loads, reloads and refreshes.")
+
+registry = [request_seconds, upstream_seconds, lookup_seconds, json_seconds, catalog_seconds]
+
+
+def register(metric):
+    registry.append(metric)
+    return metric
+
+
+def render():
+    lines = []
+    for metric in registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def timed(histogram, **labels):
+    """Observe the block's duration, labelled ``outcome="ok"`` or ``"error"``.
+
+    Works as a ``with`` block or as a function decorator.
+    """
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        histogram.observe(time.perf_counter() - start, outcome=outcome, **labels)
+
+
+class TimedJSONEncoder(JSONEncoder):
+    """Flask's encoder, timing each ``jsonify`` body per route."""
+
+    def encode(self, o):
+        start = time.perf_counter()
+        try:
+            return super().encode(o)
+        finally:
+            endpoint = request.endpoint if has_request_context() else None
+            json_seconds.observe(time.perf_counter() - start, endpoint=endpoint or "none")
+
+
+# Rows per table whose size is measured to estimate the table's size
+SIZE_SAMPLE = 100
+
+
+def _deep_size(obj):
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            # Keys are column names, shared by every row of a table.
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return total
+
+
+def _array_bytes(obj, seen):
+    """Bytes of the NumPy arrays held by ``obj``'s attributes, directly or
+    in dicts and tuples of arrays, each buffer counted once."""
+    total = 0
+    stack = list(vars(obj).values())
+    while stack:
+        item = stack.pop()
+        if isinstance(item, np.ndarray):
+            while isinstance(item.base, np.ndarray):
+                item = item.base
+            if id(item) not in seen:
+                seen.add(id(item))
+                total += item.nbytes
+        elif isinstance(item, dict) and item:
+            if isinstance(next(iter(item.values())), (np.ndarray, tuple)):
+                stack.extend(item.values())
+        elif isinstance(item, tuple):
+            stack.extend(item)
+        elif type(item).__module__.startswith("services."):
+            stack.extend(vars(item).values())
+    return total
+
+
+def catalog_size(catalog):
+    """Approximate bytes of a Catalog as ``(rows, arrays)``.
+
+    Array bytes are exact. Table rows are estimated from ``SIZE_SAMPLE``
+    rows per table, so this stays in the milliseconds at any catalog size.
+    """
+    rows = 0
+    for name in catalog.indexes:
+        table = getattr(catalog, name)
+        if table:
+            sample = table[::max(1, len(table) // SIZE_SAMPLE)][:SIZE_SAMPLE]
+            rows += sys.getsizeof(table) + len(table) * sum(map(_deep_size, sample)) // len(sample)
+    return rows, _array_bytes(catalog, set())
+
+
+class SlowRequestProfiler:
+    """Sample the stacks of in-flight requests; keep the slow ones.
+
+    A daemon thread snapshots every request thread's stack each
+    ``interval`` seconds. Requests that take at least ``threshold_ms`` get
+    their samples written to ``directory`` in the collapsed-stack format
+    that flamegraph.pl and speedscope read (``frame;frame;frame count``).
+    """
+
+    def __init__(self, directory, interval):
+        self.directory = directory
+        self.interval = interval
+        self.threshold_ms = 0
+        self.active = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def enabled(self):
+        return self.threshold_ms > 0
+
+    def configure(self, threshold_ms):
+        """Profile requests slower than ``threshold_ms``; 0 turns it off."""
+        self.threshold_ms = threshold_ms
+
+    def start(self):
+        if self.enabled:
+            with self.lock:
+                # Started on first use so it also runs in forked workers.
+                if self.thread is None or not self.thread.is_alive():
+                    self.thread = threading.Thread(target=self._sample, name="request-profiler", daemon=True)
+                    self.thread.start()
+                self.active[threading.get_ident()] = {}
+
+    def finish(self, elapsed, endpoint):
+        if not self.active:
+            return
+        with self.lock:
+            stacks = self.active.pop(threading.get_ident(), None)
+        if stacks and elapsed * 1000 >= self.threshold_ms:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"{time.strftime('%Y%m%dT%H%M%S')}-{int(elapsed * 1000)}ms-{endpoint}.folded")
+            with open(path, "w") as f:
+                for stack, count in stacks.items():
+                    f.write(f"{stack} {count}\n")
+            logging.warning(f"Slow request {endpoint} took {elapsed * 1000:.0f}ms; stacks in {path}")
+
+    def _sample(self):
+        while self.enabled:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self.lock:
+                for ident, stacks in self.active.items():
+                    frame = frames.get(ident)
+                    parts = []
+                    while frame is not None:
+                        code = frame.f_code
+                        parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                        frame = frame.f_back
+                    stack = ";".join(reversed(parts))
+                    stacks[stack] = stacks.get(stack, 0) + 1
+
+
+profiler = SlowRequestProfiler(Config.PROFILE_DIR, Config.PROFILE_INTERVAL)
+profiler.configure(Config.PROFILE_SLOW_MS)
+
+
+def init_app(app):
+    """Time every request and JSON body of ``app``."""
+    app.json_encoder = TimedJSONEncoder
+
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+        profiler.start()
+
+    @app.after_request
+    def record(response):
+        started = g.pop("request_started", None)
+        if started is not None:
+            elapsed = time.perf_counter() - started
+            endpoint = request.endpoint or "unmatched"
+            request_seconds.observe(elapsed, endpoint=endpoint, method=request.method, status=response.status_code)
+            profiler.finish(elapsed, endpoint)
+        return response
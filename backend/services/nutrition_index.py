@@ -0,0 +1,187 @@
+import numpy as np
+
+"""Dense recipe-by-nutrient matrix used for vectorized nutrition queries."""
+
+# Ratios derived from nutrient columns: name -> (numerator, denominator)
+DERIVED = {
+    "cal_per_protein": ("calories", "protein"),
+}
+
+# Rows scanned per step when paging through a sorted index with extra bounds
+SCAN_CHUNK = 1024
+
+
+class UnknownNutrient(ValueError):
+    pass
+
+
+def parse_bounds(args):
+    """Collect ``min_<nutrient>``/``max_<nutrient>`` query args.
+
+    Returns ``{nutrient: (low, high)}`` with names lower-cased and missing
+    sides left as None. Values that are not numbers are ignored, matching
+    Flask's ``args.get(..., type=float)``.
+    """
+    bounds = {}
+    for key in args:
+        prefix, _, name = key.partition("_")
+        if prefix not in ("min", "max") or not name:
+            continue
+        value = args.get(key, type=float)
+        if value is None:
+            continue
+        low, high = bounds.get(name.lower(), (None, None))
+        bounds[name.lower()] = (value, high) if prefix == "min" else (low, value)
+    return bounds
+
+
+def parse_page(args, default_sort=None):
+    """Read ``sort``, ``limit`` and ``cursor`` query args.
+
+    ``sort`` names a nutrient or derived ratio, with a leading ``-`` for
+    descending order. Without ``limit`` every match is returned.
+    """
+    sort = args.get("sort", default_sort)
+    descending = bool(sort) and sort.startswith("-")
+    if sort:
+        sort = sort.lstrip("-").lower()
+    limit = args.get("limit", type=int)
+    if limit is not None:
+        limit = max(limit, 1)
+    cursor = max(args.get("cursor", 0, type=int), 0)
+    return sort or None, descending, limit, cursor
+
+
+class NutritionMatrix:
+    """Nutrition values laid out as ``matrix[recipe_row, nutrient_column]``.
+
+    Missing values are NaN, so any comparison against them is False and a
+    bound on a nutrient a recipe lacks excludes that recipe.
+    """
+
+    def __init__(self, nutrition_rows, nutrient_map):
+        """Build from ``recipe_id -> [join rows]`` and the nutrient library map."""
+        self.columns = {}
+        column_of = {}
+        for nutrient_id, nutrient in nutrient_map.items():
+            # Nameless nutrients cannot be queried by name; leave them out.
+            name = (nutrient["name"] or "").lower()
+            if not name:
+                continue
+            column_of[nutrient_id] = self.columns.setdefault(name, len(self.columns))
+        self.names = list(self.columns)
+
+        self.recipe_ids = list(nutrition_rows)
+        self.rows = {rid: i for i, rid in enumerate(self.recipe_ids)}
+        # Column-major so each nutrient column is contiguous for masking.
+        self.matrix = np.full((len(self.recipe_ids), len(self.columns)), np.nan, order="F")
+        for i, entries in enumerate(nutrition_rows.values()):
+            for entry in entries:
+                column = column_of.get(entry.get("nutrient_id"))
+                value = entry.get("value")
+                if column is not None and value is not None:
+                    self.matrix[i, column] = float(value)
+
+        self.values = {name: self.matrix[:, column] for name, column in self.columns.items()}
+        for name, (numerator, denominator) in DERIVED.items():
+            if numerator in self.values and denominator in self.values:
+                top, bottom = self.values[numerator], self.values[denominator]
+                ratio = np.full(len(self.recipe_ids), np.nan)
+                np.divide(top, bottom, out=ratio, where=bottom != 0)
+                self.values[name] = ratio
+
+        self.sorted = {name: self._sort(values) for name, values in self.values.items()}
+
+    @staticmethod
+    def _sort(values):
+        """Rows with a value, ascending by it, plus the sorted values for bisecting."""
+        rows = (~np.isnan(values)).nonzero()[0]
+        order = np.argsort(values[rows], kind="stable")
+        return rows[order], values[rows][order]
+
+    def column(self, name):
+        try:
+            return self.values[name]
+        except KeyError:
+            raise UnknownNutrient(name)
+
+    def mask(self, bounds, rows=None):
+        """Boolean mask for ``{nutrient: (low, high)}`` bounds.
+
+        Covers every recipe, or just ``rows`` when given.
+        """
+        size = len(self.recipe_ids) if rows is None else len(rows)
+        mask = np.ones(size, dtype=bool)
+        for name, (low, high) in bounds.items():
+            values = self.column(name)
+            if rows is not None:
+                values = values[rows]
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+        return mask
+
+    def query(self, bounds, sort=None, descending=False, limit=None, cursor=0):
+        """Rows matching ``bounds`` in ``sort`` order, one page at a time.
+
+        Returns ``(rows, next_cursor)``. Sorting walks the precomputed index
+        for that key, bisecting it by any bound on the same key; recipes
+        without a value for the key are left out. Without ``sort`` rows keep
+        catalog order. The cursor is a position in that ordering, so the
+        first page only scans as far as it needs to.
+        """
+        for name in bounds:
+            self.column(name)
+
+        if sort is None:
+            candidates = np.arange(len(self.recipe_ids))
+        else:
+            if sort not in self.sorted:
+                raise UnknownNutrient(sort)
+            candidates, values = self.sorted[sort]
+            low, high = bounds.get(sort, (None, None))
+            start = 0 if low is None else np.searchsorted(values, low, "left")
+            stop = len(values) if high is None else np.searchsorted(values, high, "right")
+            candidates = candidates[start:stop]
+            if descending:
+                candidates = candidates[::-1]
+            bounds = {name: bound for name, bound in bounds.items() if name != sort}
+
+        if limit is None:
+            candidates = candidates[cursor:]
+            return candidates[self.mask(bounds, candidates)] if bounds else candidates, None
+
+        if not bounds:
+            page = candidates[cursor:cursor + limit]
+            end = cursor + limit
+            return page, end if end < len(candidates) else None
+
+        pages = []
+        found = 0
+        position = cursor
+        step = max(limit, SCAN_CHUNK)
+        while position < len(candidates) and found < limit:
+            chunk = candidates[position:position + step]
+            hits = self.mask(bounds, chunk).nonzero()[0][:limit - found]
+            pages.append(chunk[hits])
+            found += len(hits)
+            # Resume right after the last row returned, or after the chunk
+            # if it did not fill the page.
+            position = position + hits[-1] + 1 if found == limit else position + len(chunk)
+        page = np.concatenate(pages) if pages else candidates[:0]
+        return page, position if position < len(candidates) else None
+
+    def recipe_ids_at(self, rows):
+        return [self.recipe_ids[i] for i in rows]
+
+    def records(self, rows):
+        """Per-recipe dicts of every nutrient present, for JSON responses."""
+        values = self.matrix[rows].tolist()
+        return [
+            {
+                "recipe_id": self.recipe_ids[i],
+                **{name: v for name, v in zip(self.names, row) if v == v},
+            }
+            for i, row in zip(rows, values)
+        ]
@@ -1,40 +1,187 @@
-from openai import OpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from config import Config
+from services import metrics
+from services.cache import TTLCache
+import asyncio
+import httpx
 import logging
+import os
+import queue
+import threading
+
+FALLBACK_RESPONSE = "Sorry, I couldn't process your request. Please try again."
+
+# Answers keyed by (recipe_id, normalized message, recipe context)
+_cache = TTLCache(Config.CHAT_CACHE_SIZE, Config.CHAT_CACHE_TTL)
+
+# Requests currently waiting on OpenAI, so identical prompts share one call
+_inflight = {}
+_inflight_lock = threading.RLock()
+
+_loop = None
+_loop_pid = None
+_loop_lock = threading.Lock()
+_client = None
+_semaphore = None
+
+
+def _event_loop():
+    """Start the event loop thread that owns the async OpenAI client.
+
+    Created per process on first use; a loop started before a gunicorn fork
+    would not have a running thread in the worker.
+    """
+    global _loop, _loop_pid, _client, _semaphore
+    with _loop_lock:
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            threading.Thread(target=_loop.run_forever, name="openai-loop", daemon=True).start()
+            _client = AsyncOpenAI(
+                api_key=Config.OPENAI_API_KEY,
+                base_url=Config.OPENAI_BASE_URL,
+                timeout=Config.OPENAI_TIMEOUT,
+                max_retries=Config.OPENAI_MAX_RETRIES,
+                http_client=DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=Config.OPENAI_MAX_CONCURRENCY,
+                        max_keepalive_connections=Config.OPENAI_MAX_CONCURRENCY,
+                    )
+                ),
+            )
+            _semaphore = asyncio.Semaphore(Config.OPENAI_MAX_CONCURRENCY)
+        return _loop
+
+
+def _normalize(message):
+    return " ".join(message.lower().split())
+
+
+SYSTEM_PROMPT = (
+    "You are an expert meal-prep AI assistant helping a user with the recipe below. "
+    "Give clear, concise answers and only discuss this recipe. If they ask for "
+    "modifications, suggest healthy or meal-prep friendly options."
+)
+
+
+def _messages(context, user_message):
+    return [
+        {"role": "system", "content": f"{SYSTEM_PROMPT}\n\n{context}"},
+        {"role": "user", "content": user_message}
+    ]
+
+
+async def _complete(messages):
+    async with _semaphore:
+        # Timed inside the semaphore: queueing for a slot is not upstream latency.
+        with metrics.timed(metrics.upstream_seconds, service="openai", operation="chat"):
+            response = await _client.chat.completions.create(
+                model=Config.OPENAI_MODEL,
+                messages=messages
+            )
+        return response.choices[0].message.content
+
+
+_DONE = object()
+
+
+class StreamInterrupted(Exception):
+    """The upstream stream failed after part of the answer was sent."""
+
+
+async def _stream(messages, tokens):
+    """Push content deltas onto the ``tokens`` queue, then ``_DONE``."""
+    try:
+        async with _semaphore:
+            with metrics.timed(metrics.upstream_seconds, service="openai", operation="chat_stream"):
+                stream = await _client.chat.completions.create(
+                    model=Config.OPENAI_MODEL,
+                    messages=messages,
+                    stream=True
+                )
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        tokens.put(chunk.choices[0].delta.content)
+        tokens.put(_DONE)
+    except Exception as e:
+        tokens.put(e)
+
+
+def _finish(key, future):
+    with _inflight_lock:
+        _inflight.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            _cache.put(key, future.result())
 
-client = OpenAI(api_key=Config.OPENAI_API_KEY)
 
 class OpenAIService:
+    cache = _cache
+
     @staticmethod
-    def chat_with_ai(user_message, recipe_details):
-        """Generate AI-powered suggestions for recipe modifications"""
-        recipe_name = recipe_details.get('recipe', {}).get('name', 'Unknown Recipe')
-        ingredients = recipe_details.get('ingredients', [])
-        nutrition = recipe_details.get('nutrition', [])
+    def chat_with_ai(user_message, recipe_id, context):
+        """Generate AI-powered suggestions for recipe modifications
 
-        logging.info(f"Processing chat for recipe: {recipe_name}")
+        ``context`` is the recipe's precomputed prompt context from the
+        catalog. It is part of the cache key, so answers are dropped when
+        the recipe itself changes.
+        """
+        key = (recipe_id, _normalize(user_message), context)
+        cached = _cache.get(key)
+        if cached is not None:
+            return cached
+
+        logging.info(f"Processing chat for recipe: {recipe_id}")
+        loop = _event_loop()
+        with _inflight_lock:
+            future = _inflight.get(key)
+            if future is None:
+                future = asyncio.run_coroutine_threadsafe(_complete(_messages(context, user_message)), loop)
+                _inflight[key] = future
+                future.add_done_callback(lambda f: _finish(key, f))
 
-        prompt = f"""
-        You are an AI chef assistant. A user is viewing the recipe "{recipe_name}" and has asked a question:
-        
-        "{user_message}"
+        try:
+            # The upstream call is bounded by OPENAI_TIMEOUT per attempt;
+            # this only guards against waiting forever for a queue slot.
+            return future.result(timeout=Config.CHAT_WAIT_TIMEOUT)
+        except Exception as e:
+            logging.error(f"OpenAI API call failed: {e}")
+            return FALLBACK_RESPONSE
 
-        Here are the details of the recipe:
-        - **Ingredients**: {", ".join([i.get('name', 'Unknown') for i in ingredients])}
-        - **Nutritional Info**: {", ".join([f"{n.get('nutrient_name', 'Unknown')}: {n.get('value', 'N/A')} {n.get('unit', '')}" for n in nutrition])}
+    @staticmethod
+    def stream_chat(user_message, recipe_id, context):
+        """Yield the answer in pieces as OpenAI generates it.
 
-        Provide **clear, concise** answers. If they ask for modifications, suggest **healthy or meal-prep friendly** options. Only respond about this recipe.
+        A cached answer is yielded whole. If the call fails before anything
+        was produced the fallback message is yielded instead, so callers
+        always get some text; if it fails midway ``StreamInterrupted`` is
+        raised after the partial text and nothing is cached. Streams are not
+        coalesced with other requests.
         """
+        key = (recipe_id, _normalize(user_message), context)
+        cached = _cache.get(key)
+        if cached is not None:
+            yield cached
+            return
 
+        logging.info(f"Streaming chat for recipe: {recipe_id}")
+        tokens = queue.Queue()
+        future = asyncio.run_coroutine_threadsafe(_stream(_messages(context, user_message), tokens), _event_loop())
+        parts = []
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert meal-prep AI assistant."},
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            return response.choices[0].message.content
+            while True:
+                item = tokens.get(timeout=Config.OPENAI_TIMEOUT)
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                parts.append(item)
+                yield item
+            _cache.put(key, "".join(parts))
         except Exception as e:
-            logging.error(f"OpenAI API call failed: {e}")
-            return "Sorry, I couldn't process your request. Please try again."
\ No newline at end of file
+            logging.error(f"OpenAI streaming call failed: {e}")
+            if parts:
+                raise StreamInterrupted(str(e)) from e
+            yield FALLBACK_RESPONSE
+        finally:
+            # Stop generating if the client went away mid-stream.
+            future.cancel()
@@ -0,0 +1,81 @@
+from config import Config
+
+"""Compact per-recipe context for chat prompts, built with the catalog."""
+
+# Rough size of a token in characters, for budgeting without a tokenizer
+CHARS_PER_TOKEN = 4
+
+
+def _number(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return f"{value:g}"
+
+
+def _ingredient_text(entry, name):
+    parts = [_number(entry.get("amount")), entry.get("unit"), name]
+    return " ".join(p for p in parts if p)
+
+
+def build_context(recipe, ingredients, nutrition, budget):
+    """Render one recipe as a few short lines within ``budget`` tokens.
+
+    ``ingredients`` is a list of ``(join_row, name)`` and ``nutrition`` a
+    list of ``(name, value, unit)``. Ingredients are de-duplicated by name
+    and are the first thing trimmed when the budget runs out.
+    """
+    lines = [f"Recipe: {recipe.get('name') or 'Unknown Recipe'}"]
+    servings = recipe.get("servings")
+    if servings:
+        lines.append(f"Servings: {servings}")
+    if nutrition:
+        lines.append("Nutrition: " + ", ".join(
+            f"{name or 'Unknown'} {_number(value) or value}{' ' + unit if unit else ''}"
+            for name, value, unit in nutrition
+        ))
+
+    seen = set()
+    items = []
+    for entry, name in ingredients:
+        # Library names may be NULL
+        name = name or "Unknown"
+        if name.lower() in seen:
+            continue
+        seen.add(name.lower())
+        items.append(_ingredient_text(entry, name))
+
+    remaining = budget * CHARS_PER_TOKEN - sum(len(line) + 1 for line in lines) - len("Ingredients: ")
+    kept = []
+    for i, item in enumerate(items):
+        # Leave room to say how many were dropped unless this is the last one.
+        suffix = len(f", and {len(items)} more") if i + 1 < len(items) else 0
+        if len(item) + 2 + suffix > remaining:
+            kept.append(f"and {len(items) - i} more")
+            break
+        kept.append(item)
+        remaining -= len(item) + 2
+    if kept:
+        lines.insert(1, "Ingredients: " + ", ".join(kept))
+    return "\n".join(lines)
+
+
+def build_contexts(catalog, budget=None):
+    """Return ``{recipe_id: context}`` for every recipe in ``catalog``."""
+    budget = budget or Config.CHAT_CONTEXT_TOKENS
+    ingredient_rows = catalog.recipe_rows["recipe_ingredients"]
+    nutrition_rows = catalog.recipe_rows["recipe_nutrition"]
+    contexts = {}
+    for rid, recipe in catalog.recipe_index.items():
+        ingredients = [
+            (entry, catalog.ingredient_map.get(entry.get("ingredient_id"), "Unknown"))
+            for entry in ingredient_rows.get(rid, [])
+        ]
+        nutrition = []
+        for entry in nutrition_rows.get(rid, []):
+            nutrient = catalog.nutrient_map.get(entry.get("nutrient_id"))
+            if nutrient is not None and entry.get("value") is not None:
+                nutrition.append((nutrient["name"], entry["value"], nutrient["unit"]))
+        contexts[rid] = build_context(recipe, ingredients, nutrition, budget)
+    return contexts
@@ -0,0 +1,140 @@
+from config import Config
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+
+"""Token-bucket rate limiting with per-process or SQLite-shared state."""
+
+
+class MemoryBackend:
+    """Buckets in a dict; limits apply per process."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.takes = 0
+        self.lock = threading.Lock()
+
+    def take(self, key, capacity, rate, now):
+        """Spend one token from ``key``'s bucket.
+
+        Returns ``(allowed, retry_after)`` where ``retry_after`` is the
+        seconds until a token is available when not allowed.
+        """
+        with self.lock:
+            tokens, updated, _ = self.buckets.get(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+            self.takes += 1
+            if self.takes % Config.RATE_LIMIT_PRUNE_EVERY == 0:
+                # A bucket past its refill time is full, the same as absent.
+                for k, (_, _, full_at) in list(self.buckets.items()):
+                    if full_at <= now:
+                        del self.buckets[k]
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+    def reset(self, key):
+        with self.lock:
+            self.buckets.pop(key, None)
+
+
+class SQLiteBackend:
+    """Buckets in an SQLite table so limits hold across gunicorn workers."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self.takes = 0
+        self.takes_lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connection() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, full_at REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+
+    def _connection(self):
+        db = getattr(self._local, "db", None)
+        if db is None or getattr(self._local, "pid", None) != os.getpid():
+            db = sqlite3.connect(self.path, timeout=Config.RATE_LIMIT_DB_TIMEOUT)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def take(self, key, capacity, rate, now):
+        db = self._connection()
+        with db:
+            # Read and write under one write lock so workers can't both
+            # spend the last token.
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            db.execute(
+                "INSERT INTO buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated, "
+                "full_at = excluded.full_at",
+                (key, tokens, now, now + (capacity - tokens) / rate),
+            )
+            with self.takes_lock:
+                self.takes += 1
+                prune = self.takes % Config.RATE_LIMIT_PRUNE_EVERY == 0
+            if prune:
+                db.execute("DELETE FROM buckets WHERE full_at <= ?", (now,))
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+    def reset(self, key):
+        with self._connection() as db:
+            db.execute("DELETE FROM buckets WHERE key = ?", (key,))
+
+
+class RateLimiter:
+    """Allow ``capacity`` hits per key, refilled evenly over ``window`` seconds."""
+
+    def __init__(self, backend, name, capacity, window):
+        self.backend = backend
+        self.name = name
+        self.capacity = capacity
+        self.rate = capacity / window
+
+    def hit(self, key):
+        """Return ``(allowed, retry_after)``; retry_after is whole seconds."""
+        try:
+            allowed, retry_after = self.backend.take(f"{self.name}:{key}", self.capacity, self.rate, time.time())
+        except sqlite3.Error as e:
+            # A broken limiter store should not lock everyone out.
+            logging.error(f"Rate limiter {self.name} failed: {e}")
+            return True, 0
+        return allowed, math.ceil(retry_after)
+
+    def reset(self, key):
+        self.backend.reset(f"{self.name}:{key}")
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Return the process-wide limiter backend chosen by ``RATE_LIMIT_BACKEND``."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if Config.RATE_LIMIT_BACKEND == "sqlite":
+                    _backend = SQLiteBackend(Config.RATE_LIMIT_DB_PATH)
+                else:
+                    _backend = MemoryBackend()
+    return _backend
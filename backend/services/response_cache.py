@@ -0,0 +1,128 @@
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, current_app, request
+from config import Config
+import gzip
+import hashlib
+import threading
+
+"""Cache of serialized JSON responses for the read-only catalog endpoints."""
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+
+# Response headers that are part of the cached representation
+CACHED_HEADERS = ("X-Next-Cursor",)
+
+
+class CachedResponse:
+    def __init__(self, body, headers):
+        self.body = body
+        self.headers = headers
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.gzipped = None
+        if Config.RESPONSE_CACHE_GZIP and len(body) >= GZIP_MIN_BYTES:
+            self.gzipped = gzip.compress(body, compresslevel=6)
+
+    @property
+    def size(self):
+        return len(self.body) + len(self.gzipped or b"")
+
+    def respond(self):
+        """Build the response for the current request, honouring
+        ``If-None-Match`` and ``Accept-Encoding``."""
+        use_gzip = self.gzipped is not None and "gzip" in request.accept_encodings
+        etag = f"{self.etag}-gz" if use_gzip else self.etag
+
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(self.gzipped if use_gzip else self.body, mimetype="application/json")
+            if use_gzip:
+                response.headers["Content-Encoding"] = "gzip"
+        response.set_etag(etag)
+        response.headers["Vary"] = "Accept-Encoding"
+        response.headers.update(self.headers)
+        return response
+
+
+class ResponseCache:
+    """LRU of serialized responses bounded by their total size in bytes.
+
+    Entries belong to one catalog version; the first lookup under a new
+    version drops everything cached for the old one.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, version):
+        with self.lock:
+            if version != self.version:
+                self.entries.clear()
+                self.size = 0
+                self.version = version
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, version, entry):
+        if entry.size > self.max_bytes:
+            return
+        with self.lock:
+            if version != self.version:
+                return
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= old.size
+            self.entries[key] = entry
+            self.size += entry.size
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= evicted.size
+
+
+response_cache = ResponseCache(Config.RESPONSE_CACHE_MAX_BYTES)
+
+
+def cached_response(version):
+    """Serve a GET view from ``response_cache``.
+
+    ``version`` returns the catalog snapshot version the view reads from.
+    The key is the endpoint, its URL arguments and the sorted query string,
+    so argument order does not split the cache. Only 200 responses are
+    stored.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not Config.RESPONSE_CACHE_ENABLED:
+                return view(*args, **kwargs)
+
+            current = version()
+            key = (
+                request.endpoint,
+                tuple(sorted(kwargs.items())),
+                tuple(sorted(request.args.items(multi=True))),
+            )
+            entry = response_cache.get(key, current)
+            if entry is None:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                headers = {h: response.headers[h] for h in CACHED_HEADERS if h in response.headers}
+                entry = CachedResponse(response.get_data(), headers)
+                response_cache.put(key, current, entry)
+            return entry.respond()
+        return wrapper
+    return decorator
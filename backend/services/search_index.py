@@ -0,0 +1,141 @@
+from bisect import bisect_left
+import math
+import re
+
+import numpy as np
+
+"""In-process inverted index over recipe names, ingredients and tags."""
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = {"a", "an", "and", "the", "of", "with", "in", "on", "for", "to"}
+
+# How much one occurrence of a term counts towards its frequency, per field
+FIELD_WEIGHTS = {"name": 3.0, "tag": 2.0, "ingredient": 1.0}
+
+# Score multipliers for query terms that only matched loosely
+PREFIX_WEIGHT = 0.8
+FUZZY_WEIGHT = 0.5
+
+# Query terms shorter than these are matched exactly only
+MIN_PREFIX_LEN = 2
+MIN_FUZZY_LEN = 4
+MAX_PREFIX_TERMS = 50
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+def _deletes(term):
+    """Every string one character deletion away from ``term``."""
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def _within_one_edit(a, b):
+    """True when ``a`` and ``b`` differ by at most one insertion, deletion,
+    substitution or adjacent transposition."""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diff = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diff) == 1:
+            return True
+        return len(diff) == 2 and diff[1] == diff[0] + 1 and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]]
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+
+class SearchIndex:
+    """BM25-ranked inverted index with prefix and one-typo matching.
+
+    Documents are recipes, addressed by their position in ``recipe_ids``.
+    Each term's postings are stored as parallel NumPy arrays of document
+    positions and precomputed BM25 contributions, so a query is a handful of
+    vectorized scatter operations over a dense score array.
+    """
+
+    def __init__(self, recipes, ingredient_rows, ingredient_map, tag_rows, tag_map):
+        self.recipe_ids = [r["recipe_id"] for r in recipes]
+        self.names = [r.get("name", "") for r in recipes]
+
+        frequencies = {}
+        lengths = np.zeros(len(recipes))
+        for doc, recipe in enumerate(recipes):
+            rid = recipe["recipe_id"]
+            fields = [("name", recipe.get("name"))]
+            fields += [("ingredient", ingredient_map.get(e.get("ingredient_id"))) for e in ingredient_rows.get(rid, [])]
+            fields += [("tag", tag_map.get(e.get("tag_id"))) for e in tag_rows.get(rid, [])]
+            for field, text in fields:
+                weight = FIELD_WEIGHTS[field]
+                for term in tokenize(text):
+                    postings = frequencies.setdefault(term, {})
+                    postings[doc] = postings.get(doc, 0.0) + weight
+                    lengths[doc] += weight
+
+        count = max(len(recipes), 1)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / (lengths.mean() if len(recipes) else 1.0))
+        self.postings = {}
+        for term, postings in frequencies.items():
+            docs = np.fromiter(postings.keys(), dtype=np.int32, count=len(postings))
+            tf = np.fromiter(postings.values(), dtype=np.float64, count=len(postings))
+            idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            self.postings[term] = (docs, (idf * tf * (BM25_K1 + 1) / (tf + norm[docs])).astype(np.float32))
+
+        self.vocabulary = sorted(self.postings)
+        self.delete_index = {}
+        for term in self.vocabulary:
+            if len(term) >= MIN_FUZZY_LEN - 1:
+                for variant in _deletes(term) | {term}:
+                    self.delete_index.setdefault(variant, []).append(term)
+
+    def expand(self, token):
+        """Index terms a query token matches, with their score multipliers."""
+        matches = {}
+        if len(token) >= MIN_FUZZY_LEN:
+            for variant in _deletes(token) | {token}:
+                for term in self.delete_index.get(variant, ()):
+                    if _within_one_edit(token, term):
+                        matches[term] = FUZZY_WEIGHT
+        if len(token) >= MIN_PREFIX_LEN:
+            start = bisect_left(self.vocabulary, token)
+            for term in self.vocabulary[start:start + MAX_PREFIX_TERMS]:
+                if not term.startswith(token):
+                    break
+                matches[term] = PREFIX_WEIGHT
+        if token in self.postings:
+            matches[token] = 1.0
+        return matches
+
+    def search(self, query):
+        """Return ``(docs, scores)`` for recipes matching every query token,
+        best first."""
+        tokens = tokenize(query)
+        if not tokens or not self.recipe_ids:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        total = np.zeros(len(self.recipe_ids), dtype=np.float32)
+        matched = np.ones(len(self.recipe_ids), dtype=bool)
+        for token in dict.fromkeys(tokens):
+            expansions = self.expand(token)
+            if not expansions:
+                return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+            scores = np.zeros(len(self.recipe_ids), dtype=np.float32)
+            for term, weight in expansions.items():
+                docs, contributions = self.postings[term]
+                # A doc keeps the best of the terms its token expanded to.
+                scores[docs] = np.maximum(scores[docs], weight * contributions)
+            matched &= scores > 0
+            total += scores
+
+        docs = matched.nonzero()[0]
+        order = np.argsort(-total[docs], kind="stable")
+        return docs[order], total[docs][order]
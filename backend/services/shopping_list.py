@@ -0,0 +1,105 @@
+from config import Config
+from services import metrics
+from services.cache import TTLCache
+from services.units import display, normalize, parse_amount
+import math
+
+"""Merge recipe ingredients into one shopping list."""
+
+# Merged lists keyed by (catalog version, ((recipe_id, multiplier), ...))
+cache = TTLCache(Config.SHOPPING_LIST_CACHE_SIZE, Config.SHOPPING_LIST_CACHE_TTL)
+
+
+class UnknownRecipe(LookupError):
+    pass
+
+
+def serving_multiplier(recipe, selection):
+    """How many times to scale a recipe for one selection.
+
+    A selection gives either ``multiplier`` directly or ``servings``, which
+    is divided by the recipe's own serving count.
+    """
+    if selection.get("multiplier") is not None:
+        return float(selection["multiplier"])
+    if selection.get("servings") is not None:
+        base = parse_amount(recipe.get("servings")) or 1.0
+        return float(selection["servings"]) / base
+    return 1.0
+
+
+def multipliers(catalog, selections):
+    """Total multiplier per recipe, summing repeated recipes.
+
+    Raises ``UnknownRecipe`` with the missing ids and ``ValueError`` for a
+    bad multiplier.
+    """
+    totals = {}
+    missing = []
+    for selection in selections:
+        try:
+            recipe_id = int(selection.get("recipe_id"))
+        except (TypeError, ValueError):
+            recipe_id = None
+        recipe = catalog.recipe_index.get(recipe_id)
+        if recipe is None:
+            missing.append(selection.get("recipe_id"))
+            continue
+        try:
+            multiplier = serving_multiplier(recipe, selection)
+        except (TypeError, ValueError):
+            multiplier = None
+        if multiplier is None or not (multiplier > 0 and math.isfinite(multiplier)):
+            raise ValueError(f"Invalid servings for recipe {recipe_id}")
+        totals[recipe_id] = totals.get(recipe_id, 0.0) + multiplier
+    if missing:
+        raise UnknownRecipe(missing)
+    return totals
+
+
+@metrics.timed(metrics.lookup_seconds, operation="shopping_list")
+def merge_ingredients(catalog, selections):
+    """Scale and sum the ingredients of several recipes.
+
+    ``selections`` is a list of ``{"recipe_id", "servings" | "multiplier"}``.
+    Amounts of the same ingredient are converted to a common base unit and
+    added when their units measure the same thing (mass, volume, count);
+    otherwise they stay as separate lines. Each line lists the recipes that
+    use it. Results are cached per catalog version and recipe set; each
+    caller gets its own copy.
+    """
+    scaled = multipliers(catalog, selections)
+    key = (catalog.version, tuple(sorted((rid, round(m, 4)) for rid, m in scaled.items())))
+    merged = cache.get(key)
+    if merged is None:
+        merged = _merge(catalog, scaled)
+        cache.put(key, merged)
+    return [{**line, "recipe_ids": list(line["recipe_ids"])} for line in merged]
+
+
+def _merge(catalog, scaled):
+    totals = {}
+    ingredient_rows = catalog.recipe_rows["recipe_ingredients"]
+    for recipe_id, multiplier in scaled.items():
+        for entry in ingredient_rows.get(recipe_id, []):
+            ingredient_id = entry.get("ingredient_id")
+            amount = parse_amount(entry.get("amount"))
+            quantity, dimension = normalize(1.0 if amount is None else amount, entry.get("unit"))
+            line = totals.get((ingredient_id, dimension))
+            if line is None:
+                line = totals[(ingredient_id, dimension)] = {
+                    "ingredient_id": ingredient_id,
+                    "name": catalog.ingredient_map.get(ingredient_id) or "Unknown",
+                    "quantity": 0.0,
+                    "recipe_ids": [],
+                }
+            line["quantity"] += quantity * multiplier
+            if recipe_id not in line["recipe_ids"]:
+                line["recipe_ids"].append(recipe_id)
+
+    merged = []
+    for (_, dimension), line in totals.items():
+        amount, unit = display(line.pop("quantity"), dimension)
+        merged.append({**line, "amount": amount, "unit": unit})
+    merged.sort(key=lambda line: (line["name"].lower(), line["ingredient_id"] or 0))
+    return merged
@@ -0,0 +1,269 @@
+from config import Config
+import datetime
+import functools
+import gc
+import hashlib
+import json
+import logging
+import mmap
+import os
+import pickle
+import shutil
+import numpy as np
+
+"""On-disk catalog snapshots, so workers can start without Supabase.
+
+A snapshot directory holds one subdirectory per build and a ``CURRENT``
+file naming the one to load. A build is a pickled Catalog, with every NumPy
+array (nutrition matrix, sorted indexes, search postings, planner arrays)
+written out of band to ``buffers.bin``. Reading memory-maps that file and hands the
+arrays back as views on it, so they are never copied and gunicorn workers
+share the same pages through the OS page cache.
+
+Build one with::
+
+    python -m services.snapshot --source xlsx      # from backend/data/*.xlsx
+    python -m services.snapshot --source supabase
+"""
+
+# Layout of the snapshot files; the pickled classes are covered by ``schema``
+FORMAT = 2
+# Names the build directory readers should use
+CURRENT = "CURRENT"
+MANIFEST = "manifest.json"
+OBJECTS = "catalog.pickle"
+BUFFERS = "buffers.bin"
+OFFSETS = "offsets.npy"
+
+# Buffer start alignment in bytes, enough for any dtype
+ALIGN = 64
+
+
+class SnapshotError(Exception):
+    pass
+
+
+@functools.lru_cache(maxsize=None)
+def schema():
+    """Fingerprint of the classes a Catalog pickles and their attribute names.
+
+    Taken from an empty Catalog, so a snapshot from before a field was
+    added, removed or renamed is rejected rather than loaded without it.
+    """
+    from services.data_loader import Catalog
+
+    classes = {}
+    stack = [Catalog({})]
+    while stack:
+        obj = stack.pop()
+        fields = vars(obj)
+        classes[f"{type(obj).__module__}.{type(obj).__qualname__}"] = sorted(fields)
+        stack.extend(v for v in fields.values() if type(v).__module__.startswith("services."))
+    return hashlib.sha256(json.dumps(classes, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def write(catalog, path, source):
+    """Write ``catalog`` under the ``path`` directory and make it current."""
+    name = f"v{catalog.version}-{datetime.datetime.utcnow():%Y%m%dT%H%M%S%f}-{os.getpid()}"
+    directory = os.path.join(path, name)
+    os.makedirs(directory)
+    buffers = []
+    objects = pickle.dumps(catalog, protocol=5, buffer_callback=buffers.append)
+
+    offsets = np.zeros((len(buffers), 2), dtype=np.int64)
+    with open(os.path.join(directory, BUFFERS), "wb") as f:
+        position = 0
+        for i, buffer in enumerate(buffers):
+            raw = buffer.raw()
+            padding = -position % ALIGN
+            f.write(b"\0" * padding)
+            position += padding
+            offsets[i] = (position, raw.nbytes)
+            f.write(raw)
+            position += raw.nbytes
+    with open(os.path.join(directory, OBJECTS), "wb") as f:
+        f.write(objects)
+    with open(os.path.join(directory, OFFSETS), "wb") as f:
+        np.save(f, offsets)
+
+    manifest = {
+        "format": FORMAT,
+        "schema": schema(),
+        "version": catalog.version,
+        "source": source,
+        "created_at": datetime.datetime.utcnow().isoformat(),
+        "rows": {name: len(getattr(catalog, name)) for name in catalog.indexes},
+    }
+    with open(os.path.join(directory, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Swapping the pointer is the only step readers can observe, and it is
+    # atomic: they see the old build or the new one, never a mix.
+    pointer = os.path.join(path, f"{CURRENT}.{os.getpid()}.tmp")
+    with open(pointer, "w") as f:
+        f.write(name)
+    os.replace(pointer, os.path.join(path, CURRENT))
+    _prune(path, keep={name, *_previous(path, name)})
+    logging.info(f"Wrote catalog snapshot v{catalog.version} from {source} to {directory}")
+
+
+def _builds(path):
+    return sorted(
+        (entry for entry in os.listdir(path) if os.path.isdir(os.path.join(path, entry))),
+        key=lambda entry: os.path.getmtime(os.path.join(path, entry)),
+    )
+
+
+def _previous(path, name):
+    # A worker may still be opening the build that was current until now.
+    builds = [entry for entry in _builds(path) if entry != name]
+    return builds[-1:]
+
+
+def _prune(path, keep):
+    for entry in _builds(path):
+        if entry not in keep:
+            shutil.rmtree(os.path.join(path, entry), ignore_errors=True)
+
+
+def _current(path):
+    """The directory of the current build under ``path``, or None."""
+    try:
+        with open(os.path.join(path, CURRENT)) as f:
+            name = f.read().strip()
+    except OSError:
+        return None
+    return os.path.join(path, name) if name else None
+
+
+def exists(path):
+    directory = bool(path) and _current(path)
+    return bool(directory) and os.path.exists(os.path.join(directory, MANIFEST))
+
+
+def read(path):
+    """Load the current Catalog stored under ``path``; its arrays stay memory-mapped."""
+    try:
+        # Resolved once, so every file comes from the same build.
+        directory = _current(path)
+        if directory is None:
+            raise SnapshotError(f"No current snapshot in {path}")
+        with open(os.path.join(directory, MANIFEST)) as f:
+            manifest = json.load(f)
+        if manifest.get("format") != FORMAT:
+            raise SnapshotError(f"Unsupported snapshot format {manifest.get('format')} in {path}")
+        if manifest.get("schema") != schema():
+            raise SnapshotError(f"Snapshot {path} was written for a different Catalog schema")
+
+        offsets = np.load(os.path.join(directory, OFFSETS))
+        buffers = []
+        if len(offsets):
+            with open(os.path.join(directory, BUFFERS), "rb") as f:
+                # The map outlives the file handle; the arrays keep it alive.
+                view = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            buffers = [view[start:start + size] for start, size in offsets.tolist()]
+        # Unpickling allocates millions of row dicts; collection passes
+        # over them while they are being built only slow it down.
+        gc.disable()
+        try:
+            with open(os.path.join(directory, OBJECTS), "rb") as f:
+                return pickle.load(f, buffers=buffers)
+        finally:
+            gc.enable()
+    except (OSError, ValueError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+        # AttributeError/ImportError: a pickled class was renamed or moved
+        raise SnapshotError(f"Could not read snapshot {path}: {e}")
+
+
+def _records(frame):
+    """DataFrame rows as dicts of plain Python values, NaN as None."""
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict("records")
+
+
+def tables_from_xlsx(directory):
+    """Normalize the legacy xlsx exports in ``directory`` into catalog tables.
+
+    The exports are denormalized (ingredient, nutrient, diet plan and tag
+    names inline on each row), so the library tables are rebuilt from the
+    distinct names, numbered in order of first appearance.
+    """
+    import pandas as pd
+
+    def sheet(name):
+        return pd.read_excel(os.path.join(directory, f"{name}.xlsx"), sheet_name="Sheet1")
+
+    def library(names):
+        ids = {}
+        for name in names:
+            if name is not None:
+                ids.setdefault(name.strip().lower(), (len(ids) + 1, name.strip()))
+        return ids
+
+    ingredients = _records(sheet("ingredients"))
+    ingredient_ids = library(r["name"] for r in ingredients)
+    nutrition = _records(sheet("nutrition"))
+    nutrient_ids = library(r["nutrient_name"] for r in nutrition)
+    nutrient_units = {r["nutrient_name"].strip().lower(): r["unit"] for r in nutrition if r["nutrient_name"]}
+    diet = _records(sheet("recipe_diet_plan"))
+    diet_ids = library(r["diet_plan"] for r in diet)
+    tags = _records(sheet("tags"))
+    tag_ids = library(r["tag_name"] for r in tags)
+
+    def lookup(ids, name):
+        return ids[name.strip().lower()][0] if name else None
+
+    return {
+        "recipes": _records(sheet("recipes")),
+        "ingredients_library": [{"ingredient_id": i, "name": name} for i, name in ingredient_ids.values()],
+        "recipe_ingredients": [
+            {
+                "recipe_id": r["recipe_id"],
+                "ingredient_id": lookup(ingredient_ids, r["name"]),
+                "section_name": r.get("section_name"),
+                "amount": r.get("amount"),
+                "unit": r.get("unit"),
+                "notes": r.get("notes"),
+            }
+            for r in ingredients
+        ],
+        "nutrient_library": [
+            {"nutrient_id": i, "name": name, "unit": nutrient_units.get(key)}
+            for key, (i, name) in nutrient_ids.items()
+        ],
+        "recipe_nutrition": [
+            {"recipe_id": r["recipe_id"], "nutrient_id": lookup(nutrient_ids, r["nutrient_name"]), "value": r["value"]}
+            for r in nutrition
+        ],
+        "diet_plans": [{"diet_plan_id": i, "name": name} for i, name in diet_ids.values()],
+        "recipe_diet_plan": [
+            {"recipe_id": r["recipe_id"], "diet_plan_id": lookup(diet_ids, r["diet_plan"])} for r in diet
+        ],
+        "tags_library": [{"tag_id": i, "tag_name": name} for i, name in tag_ids.values()],
+        "recipe_tags": [{"recipe_id": r["recipe_id"], "tag_id": lookup(tag_ids, r["tag_name"])} for r in tags],
+        "instructions": _records(sheet("instructions")),
+        "meal_prep_tips": _records(sheet("meal_prep_tips")),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from services.data_loader import DataLoader
+
+    parser = argparse.ArgumentParser(description="Build a catalog snapshot.")
+    parser.add_argument("--source", choices=("xlsx", "supabase"), default="xlsx")
+    parser.add_argument("--data", default="data", help="directory holding the xlsx exports")
+    parser.add_argument("--out", default=Config.CATALOG_SNAPSHOT_PATH or "data/snapshot")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    start = time.perf_counter()
+    if args.source == "xlsx":
+        loader = DataLoader(tables=tables_from_xlsx(args.data))
+    else:
+        # reload() always goes to Supabase, never an existing snapshot
+        loader = DataLoader(lazy=True)
+        loader.reload()
+    loader.write_snapshot(args.out, args.source)
+    print(f"Snapshot written to {args.out} in {time.perf_counter() - start:.2f}s")
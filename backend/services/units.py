@@ -0,0 +1,89 @@
+"""Ingredient quantity parsing and unit normalization."""
+
+# unit -> (dimension, size in the dimension's base unit: grams, millilitres
+# or whole items)
+UNITS = {
+    "mg": ("mass", 0.001),
+    "g": ("mass", 1.0),
+    "gram": ("mass", 1.0),
+    "kg": ("mass", 1000.0),
+    "oz": ("mass", 28.3495),
+    "ounce": ("mass", 28.3495),
+    "lb": ("mass", 453.592),
+    "pound": ("mass", 453.592),
+    "ml": ("volume", 1.0),
+    "l": ("volume", 1000.0),
+    "liter": ("volume", 1000.0),
+    "tsp": ("volume", 4.92892),
+    "teaspoon": ("volume", 4.92892),
+    "tbsp": ("volume", 14.7868),
+    "tablespoon": ("volume", 14.7868),
+    "fl oz": ("volume", 29.5735),
+    "cup": ("volume", 236.588),
+    "pint": ("volume", 473.176),
+    "quart": ("volume", 946.353),
+    "gallon": ("volume", 3785.41),
+    "unit": ("count", 1.0),
+    "each": ("count", 1.0),
+    "whole": ("count", 1.0),
+    "piece": ("count", 1.0),
+    "": ("count", 1.0),
+}
+
+# Units used when presenting a total, largest first; the first one the total
+# reaches at least 1 of is picked.
+DISPLAY_UNITS = {
+    "mass": ("lb", "oz", "g"),
+    "volume": ("gallon", "cup", "tbsp", "tsp"),
+    "count": ("unit",),
+}
+
+
+def canonical_unit(unit):
+    """Lower-case, trim and singularize a unit name ("Cups" -> "cup")."""
+    unit = (unit or "").strip().lower().rstrip(".")
+    if unit not in UNITS and unit.endswith("es") and unit[:-2] in UNITS:
+        return unit[:-2]
+    if unit not in UNITS and unit.endswith("s") and unit[:-1] in UNITS:
+        return unit[:-1]
+    return unit
+
+
+def parse_amount(amount):
+    """Parse ``1``, ``"0.5"``, ``"1/2"`` or ``"1 1/2"``; None if unreadable."""
+    if isinstance(amount, (int, float)):
+        return float(amount)
+    total = 0.0
+    try:
+        for part in str(amount).split():
+            if "/" in part:
+                numerator, denominator = part.split("/", 1)
+                total += float(numerator) / float(denominator)
+            else:
+                total += float(part)
+    except (ValueError, ZeroDivisionError):
+        return None
+    return total if str(amount).strip() else None
+
+
+def normalize(amount, unit):
+    """Return ``(quantity, dimension)`` in the dimension's base unit.
+
+    Units we do not know keep their own name as the dimension, so they only
+    ever merge with the same unit.
+    """
+    unit = canonical_unit(unit)
+    dimension, size = UNITS.get(unit, (unit, 1.0))
+    return amount * size, dimension
+
+
+def display(quantity, dimension):
+    """Convert a base-unit total back to a readable ``(amount, unit)``."""
+    units = DISPLAY_UNITS.get(dimension)
+    if units is None:
+        return round(quantity, 2), dimension
+    for unit in units:
+        amount = quantity / UNITS[unit][1]
+        if amount >= 1:
+            return round(amount, 2), unit
+    return round(quantity / UNITS[units[-1]][1], 2), units[-1]
@@ -0,0 +1,174 @@
+from abc import ABC, abstractmethod
+from config import Config
+import datetime
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+"""User accounts keyed by phone number."""
+
+
+def _now():
+    return datetime.datetime.utcnow().isoformat()
+
+
+class UserStore(ABC):
+    """Interface the auth routes use; users are ``{username, phone, created_at}``."""
+
+    @abstractmethod
+    def get(self, phone):
+        """Return the user for ``phone`` or None."""
+
+    @abstractmethod
+    def get_or_create(self, phone, username):
+        """Return the user for ``phone``, creating it with ``username`` if new."""
+
+    @abstractmethod
+    def upsert(self, phone, username):
+        """Create the user or set its username; returns the user."""
+
+    @abstractmethod
+    def update_username(self, phone, username):
+        """Set the username of an existing user; None if there is no such user."""
+
+    @abstractmethod
+    def revoke_token(self, token_id, expires_at):
+        """Record a revoked session token until ``expires_at`` (epoch seconds)."""
+
+    @abstractmethod
+    def is_token_revoked(self, token_id):
+        """Whether ``token_id`` was revoked and has not expired yet."""
+
+
+class SQLiteUserStore(UserStore):
+    """Users in an SQLite table with ``phone`` as primary key.
+
+    The database runs in WAL mode so readers never block on a writer and
+    several gunicorn workers can share one file. Each thread gets its own
+    connection.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connection() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                "phone TEXT PRIMARY KEY, username TEXT NOT NULL, created_at TEXT NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS revoked_tokens ("
+                "token_id TEXT PRIMARY KEY, expires_at REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+
+    def _connection(self):
+        db = getattr(self._local, "db", None)
+        if db is None or getattr(self._local, "pid", None) != os.getpid():
+            db = sqlite3.connect(self.path, timeout=Config.USER_DB_TIMEOUT)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            # Durable at checkpoints rather than every commit, the usual
+            # WAL pairing; a crash can lose only the last few logins.
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    @staticmethod
+    def _user(row):
+        return dict(row) if row is not None else None
+
+    def get(self, phone):
+        row = self._connection().execute(
+            "SELECT username, phone, created_at FROM users WHERE phone = ?", (phone,)
+        ).fetchone()
+        return self._user(row)
+
+    def get_or_create(self, phone, username):
+        with self._connection() as db:
+            db.execute(
+                "INSERT INTO users (phone, username, created_at) VALUES (?, ?, ?) ON CONFLICT(phone) DO NOTHING",
+                (phone, username, _now()),
+            )
+        return self.get(phone)
+
+    def upsert(self, phone, username):
+        with self._connection() as db:
+            db.execute(
+                "INSERT INTO users (phone, username, created_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(phone) DO UPDATE SET username = excluded.username",
+                (phone, username, _now()),
+            )
+        return self.get(phone)
+
+    def update_username(self, phone, username):
+        with self._connection() as db:
+            updated = db.execute("UPDATE users SET username = ? WHERE phone = ?", (username, phone)).rowcount
+        return self.get(phone) if updated else None
+
+    def revoke_token(self, token_id, expires_at):
+        with self._connection() as db:
+            db.execute(
+                "INSERT INTO revoked_tokens (token_id, expires_at) VALUES (?, ?) ON CONFLICT(token_id) DO NOTHING",
+                (token_id, expires_at),
+            )
+            # Expired tokens fail verification anyway; revocations are rare
+            # enough to prune on each one.
+            db.execute("DELETE FROM revoked_tokens WHERE expires_at < ?", (time.time(),))
+
+    def is_token_revoked(self, token_id):
+        row = self._connection().execute(
+            "SELECT 1 FROM revoked_tokens WHERE token_id = ? AND expires_at >= ?", (token_id, time.time())
+        ).fetchone()
+        return row is not None
+
+    def migrate_json(self, path):
+        """Import a legacy ``users.json`` once; later calls are no-ops.
+
+        Existing rows win over the file, and the file is left in place.
+        Returns the number of users imported.
+        """
+        if not os.path.exists(path):
+            return 0
+        db = self._connection()
+        with db:
+            # Take the write lock first so concurrent workers import once.
+            db.execute("BEGIN IMMEDIATE")
+            if db.execute("SELECT 1 FROM meta WHERE key = 'migrated_json'").fetchone():
+                return 0
+            with open(path, "r") as f:
+                users = json.load(f)
+            imported = db.executemany(
+                "INSERT INTO users (phone, username, created_at) VALUES (?, ?, ?) ON CONFLICT(phone) DO NOTHING",
+                [
+                    (phone, user.get("username") or f"User_{phone[-4:]}", user.get("created_at") or _now())
+                    for phone, user in users.items()
+                ],
+            ).rowcount
+            db.execute("INSERT INTO meta (key, value) VALUES ('migrated_json', ?)", (_now(),))
+        logging.info(f"Migrated {imported} users from {path}")
+        return imported
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_user_store():
+    """Return the process-wide user store, migrating ``users.json`` on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = SQLiteUserStore(Config.USER_DB_PATH)
+                store.migrate_json(Config.USERS_JSON_PATH)
+                _store = store
+    return _store